@@ -1,16 +1,58 @@
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
+import asyncio
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
 load_dotenv()
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson and hands bytes straight to the response."""
+    
+    def _options(self):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        return options | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options())
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 def create_app():
     app = Flask(__name__)
     
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    
     CORS(app)
     
+    if Compress is not None:
+        app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/plain', 'text/html']
+        app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+        # COMPRESS_LEVEL only applies to gzip; brotli has its own setting
+        app.config['COMPRESS_LEVEL'] = 6
+        app.config['COMPRESS_BR_LEVEL'] = 6
+        Compress(app)
+    
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
     
     if os.environ.get('DYNO'):
@@ -26,21 +68,44 @@ def create_app():
     
     app.config['DEBUG'] = os.getenv('DEBUG', 'False').lower() == 'true'
     
+    app.config['X_ACCEL_REDIRECT_PREFIX'] = os.environ.get('X_ACCEL_REDIRECT_PREFIX')
+    
+    app.executor = ThreadPoolExecutor(
+        max_workers=int(os.environ.get('WORKERS', 4)),
+        thread_name_prefix='ppt'
+    )
+    
+    app.loop = asyncio.new_event_loop()
+    threading.Thread(target=app.loop.run_forever, name='ppt-loop', daemon=True).start()
+    
     from .routes import main
     app.register_blueprint(main)
     
-    def schedule_cleanup():
-        import time
+    from .utils import fail_orphaned_jobs
+    fail_orphaned_jobs()
+    
+    # Build the Gemini client off the request path so the first upload doesn't pay for it
+    from .utils import get_llm, logger
+    
+    def report_warmup(future):
+        # get_llm isn't cached on failure, so the first request retries and raises properly
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Gemini client warm-up failed: {error}", exc_info=error)
+    
+    app.executor.submit(get_llm).add_done_callback(report_warmup)
+    
+    def cleanup_loop(interval=900):
         from .utils import cleanup_old_files
-        while True:
-            time.sleep(3600)
+        while not app.cleanup_stop.wait(interval):
             try:
                 cleanup_old_files()
-            except Exception as e:
-                print(f"Cleanup error: {e}")
+            except Exception:
+                logger.exception("Cleanup error")
     
-    cleanup_thread = threading.Thread(target=schedule_cleanup)
-    cleanup_thread.daemon = True
-    cleanup_thread.start()
+    # Set app.cleanup_stop to end the loop (e.g. from tests or on shutdown)
+    app.cleanup_stop = threading.Event()
+    app.cleanup_thread = threading.Thread(target=cleanup_loop, name='cleanup', daemon=True)
+    app.cleanup_thread.start()
     
     return app
\ No newline at end of file
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def cache_key(model: str, content: str) -> str:
+    """Hash content after collapsing whitespace and case so reformatted copies share a key."""
+    normalized = _WHITESPACE_RE.sub(' ', content).strip().lower()
+    return hashlib.sha256(f"{model}\0{normalized}".encode('utf-8')).hexdigest()[:32]
+
+def exact_cache_key(model: str, content: str) -> str:
+    """Hash content byte for byte, for inputs where case or spacing changes the result."""
+    return hashlib.sha256(f"{model}\0{content}".encode('utf-8')).hexdigest()[:32]
+
+class LLMCache:
+    """Thread-safe LRU cache of LLM results with a per-entry time-to-live.
+
+    With a directory, JSON-serializable values are also written to <key>.json
+    there so they survive restarts; file age is checked against the same ttl.
+    With normalize=False, keys match content exactly instead of via cache_key.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 3600, directory: Optional[str] = None,
+                 normalize: bool = True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.directory = directory
+        self._key = cache_key if normalize else exact_cache_key
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            age = time.time() - os.stat(path).st_mtime
+            if age > self.ttl:
+                return None
+            with open(path, 'r', encoding='utf-8') as fh:
+                value = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        self._store(key, value, self.ttl - age)
+        return value
+
+    def _save(self, key: str, value: Any):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                json.dump(value, fh)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def _store(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, model: str, content: str) -> Optional[Any]:
+        key = self._key(model, content)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+        if self.directory:
+            return self._load(key)
+        return None
+
+    def set(self, model: str, content: str, value: Any):
+        key = self._key(model, content)
+        self._store(key, value, self.ttl)
+        if self.directory:
+            self._save(key, value)
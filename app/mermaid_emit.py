@@ -0,0 +1,40 @@
+"""Mermaid text emission for parsed flowcharts.
+
+Kept free of Flask/LangChain imports and fully annotated so it can be
+compiled with mypyc (``mypyc app/mermaid_emit.py``); the pure-Python module
+is used unchanged when no compiled build is present.
+"""
+import io
+import re
+from typing import Tuple
+
+FLOWCHART_LABEL_RE = re.compile(r'^(?P<term>start|begin|end|finish|stop)$|(?P<dec>\?|decision)', re.IGNORECASE)
+FLOWCHART_HEADER = 'flowchart TD'
+FLOWCHART_NODE_STADIUM = '    {}([{}])'
+FLOWCHART_NODE_DECISION = '    {}{{{}}}'
+FLOWCHART_NODE_BOX = '    {}[{}]'
+# Leading newline so each edge is one PyUnicode_Format call and one write
+FLOWCHART_EDGE_TEMPLATE = '\n    %s --> %s'
+# Indexed by shape: terminal, decision, process
+FLOWCHART_NODE_FORMATS = (FLOWCHART_NODE_STADIUM, FLOWCHART_NODE_DECISION, FLOWCHART_NODE_BOX)
+
+def format_flowchart_node(node_id: str, node_label: str) -> str:
+    """Return the Mermaid node line, shaped by whether the label is a terminal or a decision."""
+    match = FLOWCHART_LABEL_RE.search(node_label)
+    if match is None:
+        shape = 2
+    else:
+        shape = 0 if match.group('term') else 1
+    return FLOWCHART_NODE_FORMATS[shape].format(node_id, node_label)
+
+def emit(nodes: Tuple[Tuple[str, str], ...], edges: Tuple[Tuple[str, str], ...]) -> str:
+    """Render (id, label) nodes and (from_id, to_id) edges as a Mermaid flowchart."""
+    # Written straight into one buffer instead of keeping every line alive for a join
+    buf = io.StringIO()
+    buf.write(FLOWCHART_HEADER)
+    for node_id, node_label in nodes:
+        buf.write('\n')
+        buf.write(format_flowchart_node(node_id, node_label))
+    for edge in edges:
+        buf.write(FLOWCHART_EDGE_TEMPLATE % edge)
+    return buf.getvalue()
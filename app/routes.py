@@ -1,29 +1,70 @@
 import os
-import sys
+import re
+import json
+import asyncio
 import shutil
-from flask import Blueprint, render_template, request, send_file, jsonify
+import time
+from flask import Blueprint, Response, render_template, request, send_from_directory, send_file, jsonify, current_app
 from werkzeug.utils import secure_filename
-from datetime import datetime
 import tempfile
-import threading
 import uuid
+from functools import lru_cache
+from concurrent.futures import wait as wait_for_futures
+from queue import Empty
+
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
 
 from .utils import (
     allowed_file, read_document_content, generate_presentation_content,
-    process_presentation_job, active_jobs, job_results, cleanup_old_files,
-    logger
+    process_presentation_job_async, jobs, job_futures, FINISHED_STATUSES,
+    pending_predictions, job_lock, cleanup_old_files, get_llm, predict_num_slides,
+    iso_timestamp, get_job_snapshot, job_source, subscribe_job, unsubscribe_job,
+    slide_prediction_cache, create_document_cache, document_caches, CONTEXT_CACHE_ENABLED,
+    UPLOADS_DIR, OUTPUTS_DIR, LLM_MODEL, THEMES, TEXT_SIZES, logger
 )
 
 main = Blueprint("main", __name__)
 
+cached_secure_filename = lru_cache(maxsize=1024)(secure_filename)
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+MAX_STATUS_WAIT = 30
+MAX_JSON_BODY = 1024 * 1024
+WS_KEEPALIVE = 30
+STATIC_MAX_AGE = 31536000
+DEBUG_JOBS = os.environ.get('DEBUG_JOBS') == '1'
+STATIC_SUFFIX_RE = re.compile(r'\.(?:css|js|png|jpe?g|gif|ico|svg|woff2?|ttf)$', re.IGNORECASE)
+
+CONFIG_JSON = json.dumps({
+    'themes': list(THEMES.keys()),
+    'text_sizes': list(TEXT_SIZES.keys()),
+    'tones': ["professional", "friendly", "urgent", "academic", "casual", "inspiring"],
+    'audiences': ["general public", "technical professionals", "students", "executives", "policymakers", "researchers"],
+    'output_formats': ["pptx", "pdf"],
+    'max_slides': 20,
+    'min_slides': 3,
+    'supported_file_types': ['txt', 'docx', 'pdf']
+}).encode('utf-8')
+CONFIG_HEADERS = {
+    'Content-Type': 'application/json',
+    'Cache-Control': 'public, max-age=3600'
+}
+
 @main.route("/")
 def index():
     return render_template("index.html")
 
 @main.route('/favicon.ico')
 def favicon():
-    from flask import abort
-    return '', 204
+    return send_from_directory(
+        current_app.static_folder,
+        'favicon.ico',
+        mimetype='image/vnd.microsoft.icon',
+        max_age=STATIC_MAX_AGE
+    )
 
 @main.route('/robots.txt')
 def robots():
@@ -31,12 +72,22 @@ def robots():
 
 @main.route('/manifest.json')
 def manifest():
-    return '', 204
+    return send_from_directory(
+        current_app.static_folder,
+        'manifest.json',
+        mimetype='application/manifest+json',
+        max_age=STATIC_MAX_AGE
+    )
+
+@main.after_app_request
+def cache_static_assets(response):
+    if request.path.startswith('/static/') and response.status_code == 200:
+        response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}, immutable'
+    return response
 
 @main.route('/<path:filename>')
 def catch_static_files(filename):
-    static_extensions = ['.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.ico', '.svg', '.woff', '.woff2', '.ttf']
-    if any(filename.lower().endswith(ext) for ext in static_extensions):
+    if STATIC_SUFFIX_RE.search(filename):
         return '', 204
     from flask import abort
     abort(404)
@@ -45,23 +96,13 @@ def catch_static_files(filename):
 def health_check():
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': iso_timestamp(),
         'version': '1.0.0'
     })
 
 @main.route('/api/config', methods=['GET'])
 def get_config():
-    from .utils import THEMES, TEXT_SIZES
-    return jsonify({
-        'themes': list(THEMES.keys()),
-        'text_sizes': list(TEXT_SIZES.keys()),
-        'tones': ["professional", "friendly", "urgent", "academic", "casual", "inspiring"],
-        'audiences': ["general public", "technical professionals", "students", "executives", "policymakers", "researchers"],
-        'output_formats': ["pptx", "pdf"],
-        'max_slides': 20,
-        'min_slides': 3,
-        'supported_file_types': ['txt', 'docx', 'pdf']
-    })
+    return Response(CONFIG_JSON, headers=CONFIG_HEADERS)
 
 @main.route('/api/upload', methods=['POST'])
 def upload_file():
@@ -76,52 +117,78 @@ def upload_file():
         if not allowed_file(file.filename):
             return jsonify({'error': 'File type not supported. Allowed: txt, docx, pdf'}), 400
         
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        unique_filename = f"{timestamp}_{filename}"
-        
-        if os.environ.get('DYNO'):
-            uploads_dir = '/tmp'
-        else:
-            uploads_dir = os.path.join(os.getcwd(), 'uploads')
-            os.makedirs(uploads_dir, exist_ok=True)
-        
-        filepath = os.path.join(uploads_dir, unique_filename)
-        file.save(filepath)
+        filename = cached_secure_filename(file.filename)
+        fd, filepath = tempfile.mkstemp(prefix='', suffix=f"_{filename}", dir=UPLOADS_DIR)
+        unique_filename = os.path.basename(filepath)
+        with os.fdopen(fd, 'wb', buffering=UPLOAD_CHUNK_SIZE) as fh:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(fh.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            shutil.copyfileobj(file.stream, fh, length=UPLOAD_CHUNK_SIZE)
         
         doc_content = read_document_content(filepath)
+        content_length = len(doc_content)
+        content_preview = doc_content[:500] + "..." if content_length > 500 else doc_content
         
-        try:
-            sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-            from ppt_maker_flo import predict_num_slides, ChatGoogleGenerativeAI
-            llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash-exp", temperature=0.0)
-            predicted_slides = predict_num_slides(doc_content, llm)
-        except Exception as e:
-            print(f"Could not predict slides: {e}")
-            predicted_slides = 5
+        prediction_id = uuid.uuid4().hex
+        pending_predictions[prediction_id] = current_app.executor.submit(predict_slides, doc_content)
+        if CONTEXT_CACHE_ENABLED:
+            current_app.executor.submit(create_document_cache, filepath, doc_content)
+        del doc_content
         
         return jsonify({
             'message': 'File uploaded successfully',
             'filename': unique_filename,
             'filepath': filepath,
-            'content_preview': doc_content[:500] + "..." if len(doc_content) > 500 else doc_content,
-            'content_length': len(doc_content),
-            'predicted_slides': predicted_slides
+            'content_preview': content_preview,
+            'content_length': content_length,
+            'prediction_id': prediction_id
         })
         
     except Exception as e:
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
 
+def predict_slides(doc_content):
+    cached = slide_prediction_cache.get(LLM_MODEL, doc_content)
+    if cached is not None:
+        return cached
+    
+    try:
+        predicted_slides = predict_num_slides(doc_content, get_llm())
+    except Exception as e:
+        logger.warning("Could not predict slides: %s", e)
+        return 5
+    
+    slide_prediction_cache.set(LLM_MODEL, doc_content, predicted_slides)
+    return predicted_slides
+
+@main.route('/api/upload/<prediction_id>/prediction', methods=['GET'])
+def get_slide_prediction(prediction_id):
+    future = pending_predictions.get(prediction_id)
+    
+    if future is None:
+        return jsonify({'error': 'Prediction not found'}), 404
+    if not future.done():
+        return jsonify({'status': 'pending'}), 202
+    
+    return jsonify({
+        'status': 'completed',
+        'predicted_slides': future.result()
+    })
+
 @main.route('/api/generate', methods=['POST'])
 def generate_presentation():
     try:
-        data = request.get_json()
+        if request.content_length is not None and request.content_length > MAX_JSON_BODY:
+            return jsonify({'error': 'Request body too large'}), 413
+        
+        data = request.get_json(cache=False, silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Invalid JSON body'}), 400
         
         if not data.get('topic') and not data.get('doc_filepath'):
             return jsonify({'error': 'Either topic or document file is required'}), 400
         
-        job_id = str(uuid.uuid4())
-        print(f"Generated job_id: {job_id}")
+        job_id = uuid.uuid4().hex
         
         config = {
             'topic': data.get('topic', ''),
@@ -138,24 +205,29 @@ def generate_presentation():
         if data.get('doc_filepath'):
             doc_content = read_document_content(data['doc_filepath'])
             config['doc_content'] = doc_content
-            print(f"Document content loaded: {len(doc_content)} characters")
-            print(f"Document filepath: {data['doc_filepath']}")
-        else:
-            print("No document filepath provided")
-        
-        active_jobs[job_id] = {
-            'status': 'started',
-            'progress': 0,
-            'created_at': datetime.now().isoformat(),
-            'config': config
-        }
-        
-        print(f"Job {job_id} initialized in active_jobs")
-        print(f"Current active jobs: {list(active_jobs.keys())}")
-        
-        thread = threading.Thread(target=process_presentation_job, args=(job_id, config))
-        thread.daemon = True
-        thread.start()
+            cache_name = document_caches.get(data['doc_filepath'])
+            if cache_name:
+                config['cached_content'] = cache_name
+            logger.debug("Job %s: loaded %d characters from %s", job_id, len(doc_content), data['doc_filepath'])
+        
+        created_at_ns = time.time_ns()
+        with job_lock(job_id):
+            jobs[job_id] = {
+                'status': 'started',
+                'progress': 0,
+                'created_at_ns': created_at_ns,
+                'created_at': iso_timestamp(created_at_ns),
+                'config': config
+            }
+        
+        logger.debug("Job %s started", job_id)
+        
+        future = asyncio.run_coroutine_threadsafe(
+            process_presentation_job_async(job_id, config, current_app.executor),
+            current_app.loop
+        )
+        job_futures[job_id] = future
+        future.add_done_callback(lambda f: job_futures.pop(job_id, None))
         
         return jsonify({
             'job_id': job_id,
@@ -172,49 +244,66 @@ def get_job_status(job_id):
         if not job_id or len(job_id) < 10:
             return jsonify({'error': 'Invalid job ID format'}), 400
         
-        logger.info(f"Checking status for job_id: {job_id}")
-        logger.info(f"Active jobs: {list(active_jobs.keys())}")
-        logger.info(f"Completed jobs: {list(job_results.keys())}")
-        
-        if job_id in active_jobs:
-            response_data = active_jobs[job_id].copy()
-            response_data['source'] = 'active_jobs'
-            return jsonify(response_data)
-        elif job_id in job_results:
-            response_data = job_results[job_id].copy()
-            response_data['source'] = 'job_results'
-            return jsonify(response_data)
-        else:
-            return jsonify({
+        wait_seconds = min(request.args.get('wait', 0, type=float), MAX_STATUS_WAIT)
+        if wait_seconds > 0:
+            future = job_futures.get(job_id)
+            if future is not None:
+                wait_for_futures([future], timeout=wait_seconds)
+        
+        response_data = get_job_snapshot(job_id)
+        if response_data is None:
+            job_ids_by_source = {'active_jobs': [], 'job_results': []}
+            for other_id, job_data in jobs.items():
+                job_ids_by_source[job_source(job_data)].append(other_id)
+            not_found_data = {
                 'error': 'Job not found',
                 'job_id': job_id,
-                'active_jobs_count': len(active_jobs),
-                'completed_jobs_count': len(job_results),
-                'debug_info': {
-                    'active_job_ids': list(active_jobs.keys()),
-                    'completed_job_ids': list(job_results.keys())
+                'active_jobs_count': len(job_ids_by_source['active_jobs']),
+                'completed_jobs_count': len(job_ids_by_source['job_results'])
+            }
+            if DEBUG_JOBS:
+                not_found_data['debug_info'] = {
+                    'active_job_ids': job_ids_by_source['active_jobs'],
+                    'completed_job_ids': job_ids_by_source['job_results']
                 }
-            }), 404
+            return jsonify(not_found_data), 404
+        return jsonify(response_data)
             
     except Exception as e:
         logger.error(f"Status check failed for job {job_id}: {e}")
         return jsonify({'error': f'Status check failed: {str(e)}'}), 500
 
+if Sock is not None:
+    sock = Sock()
+    
+    @sock.route('/ws/status/<job_id>', bp=main)
+    def job_status_socket(ws, job_id):
+        updates = subscribe_job(job_id)
+        try:
+            snapshot = get_job_snapshot(job_id)
+            while snapshot is not None:
+                ws.send(current_app.json.dumps(snapshot))
+                if snapshot.get('status') in ('completed', 'failed'):
+                    return
+                try:
+                    snapshot = updates.get(timeout=WS_KEEPALIVE)
+                except Empty:
+                    snapshot = get_job_snapshot(job_id)
+            ws.send(current_app.json.dumps({'error': 'Job not found', 'job_id': job_id}))
+        finally:
+            unsubscribe_job(job_id, updates)
+
 @main.route('/api/download/<job_id>', methods=['GET'])
 def download_presentation(job_id):
     try:
-        if job_id not in job_results:
+        result = jobs.get(job_id)
+        if result is None:
             return jsonify({'error': 'Job not found'}), 404
         
-        result = job_results[job_id]
         if result['status'] != 'completed':
             return jsonify({'error': 'Presentation not ready'}), 400
         
-        if os.environ.get('DYNO'):
-            download_dir = '/tmp'
-        else:
-            download_dir = os.path.join(os.getcwd(), 'outputs')
-        download_filepath = os.path.join(download_dir, result['filename'])
+        download_filepath = os.path.join(OUTPUTS_DIR, result['filename'])
         
         file_format = result['config'].get('file_format', 'pptx')
         user_filename = result['config'].get('filename', 'presentation')
@@ -228,20 +317,26 @@ def download_presentation(job_id):
                 user_filename += '.pptx'
             mimetype = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
         
-        if not os.path.exists(download_filepath):
-            original_filepath = result['filepath']
-            if os.path.exists(original_filepath):
-                os.makedirs(download_dir, exist_ok=True)
-                shutil.copy2(original_filepath, download_filepath)
-            else:
-                return jsonify({'error': 'File not found'}), 404
-        
-        return send_file(
-            download_filepath,
-            as_attachment=True,
-            download_name=user_filename,
-            mimetype=mimetype
-        )
+        accel_prefix = current_app.config.get('X_ACCEL_REDIRECT_PREFIX')
+        if accel_prefix:
+            response = current_app.response_class(mimetype=mimetype)
+            response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{result['filename']}"
+            response.headers.set('Content-Disposition', 'attachment', filename=user_filename)
+            return response
+        
+        for path in (download_filepath, result['filepath']):
+            try:
+                return send_file(
+                    path,
+                    as_attachment=True,
+                    download_name=user_filename,
+                    mimetype=mimetype,
+                    etag=True,
+                    conditional=True
+                )
+            except FileNotFoundError:
+                continue
+        return jsonify({'error': 'File not found'}), 404
         
     except Exception as e:
         return jsonify({'error': f'Download failed: {str(e)}'}), 500
@@ -249,24 +344,17 @@ def download_presentation(job_id):
 @main.route('/api/jobs', methods=['GET'])
 def list_jobs():
     try:
-        all_jobs = {}
-        
-        for job_id, job_data in active_jobs.items():
-            all_jobs[job_id] = job_data
+        limit = max(0, request.args.get('limit', 50, type=int))
+        offset = max(0, request.args.get('offset', 0, type=int))
+        count = offset + limit
         
-        for job_id, job_data in job_results.items():
-            if job_id not in all_jobs:
-                all_jobs[job_id] = job_data
-        
-        sorted_jobs = dict(sorted(
-            all_jobs.items(),
-            key=lambda x: x[1].get('created_at', ''),
-            reverse=True
-        ))
+        newest = jobs.recent(count)
         
         return jsonify({
-            'jobs': sorted_jobs,
-            'total': len(sorted_jobs)
+            'jobs': dict(newest[offset:]),
+            'total': len(jobs),
+            'limit': limit,
+            'offset': offset
         })
         
     except Exception as e:
@@ -283,10 +371,10 @@ def manual_cleanup():
 @main.route('/api/preview/<job_id>', methods=['GET'])
 def preview_presentation(job_id):
     try:
-        if job_id not in job_results:
+        result = jobs.get(job_id)
+        if result is None:
             return jsonify({'error': 'Job not found'}), 404
         
-        result = job_results[job_id]
         if result['status'] != 'completed':
             return jsonify({'error': 'Presentation not ready'}), 400
         
@@ -308,18 +396,25 @@ def preview_presentation(job_id):
 
 @main.route('/api/debug/jobs', methods=['GET'])
 def debug_jobs():
+    active_snapshot = []
+    completed_snapshot = []
+    for job_id, job_data in jobs.items():
+        if job_data.get('status') in FINISHED_STATUSES:
+            completed_snapshot.append((job_id, job_data))
+        else:
+            active_snapshot.append((job_id, job_data))
     return jsonify({
         'active_jobs': {
-            'count': len(active_jobs),
+            'count': len(active_snapshot),
             'jobs': {job_id: {'status': job_data.get('status'), 'progress': job_data.get('progress')} 
-                     for job_id, job_data in active_jobs.items()}
+                     for job_id, job_data in active_snapshot}
         },
         'completed_jobs': {
-            'count': len(job_results),
+            'count': len(completed_snapshot),
             'jobs': {job_id: {'status': job_data.get('status')} 
-                     for job_id, job_data in job_results.items()}
+                     for job_id, job_data in completed_snapshot}
         },
-        'total_jobs': len(active_jobs) + len(job_results)
+        'total_jobs': len(active_snapshot) + len(completed_snapshot)
     })
 
 @main.app_errorhandler(413)
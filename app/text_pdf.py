@@ -0,0 +1,185 @@
+"""Text-only PPTX to PDF converters used when no office suite is available.
+
+Imports nothing beyond python-pptx and reportlab (both lazily) and no other
+app module, so app.utils.convert_pptx_to_pdf_text_only can run it as a script
+(python text_pdf.py <pptx> <pdf>) without loading Flask, LangChain or the
+parent's __main__.
+"""
+import os
+import sys
+from functools import lru_cache
+
+def write_pdf_bytes(pdf_path: str, data):
+    """Write a PDF rendered in memory to disk in one write instead of many small ones."""
+    with open(pdf_path, 'wb') as pdf_file:
+        pdf_file.write(data)
+
+@lru_cache(maxsize=2)
+def _load_presentation_cached(pptx_path: str, mtime_ns: int):
+    from pptx import Presentation
+    return Presentation(pptx_path)
+
+def load_presentation(pptx_path: str):
+    """Parse a deck once for all text-based fallbacks; a rewritten file gets a fresh parse."""
+    return _load_presentation_cached(os.path.abspath(pptx_path), os.stat(pptx_path).st_mtime_ns)
+
+@lru_cache(maxsize=2)
+def presentation_slide_lines(prs):
+    """
+    Return the non-empty text lines of each slide, extracted once per parsed deck.
+    A text block repeated at the same position as on an earlier slide (footers and
+    other template boilerplate) is only kept the first time it appears.
+    """
+    seen_blocks = set()
+    slides = []
+    for slide in prs.slides:
+        lines = []
+        for shape in slide.shapes:
+            try:
+                text = shape.text.strip() if hasattr(shape, 'text') else ''
+                if not text:
+                    continue
+                block = (shape.left, shape.top, shape.width, shape.height, text)
+                if block in seen_blocks:
+                    continue
+                seen_blocks.add(block)
+                lines.extend(line.strip() for line in text.split('\n') if line.strip())
+            except Exception as shape_error:
+                print(f"Error processing shape: {shape_error}")
+        slides.append(tuple(lines))
+    return tuple(slides)
+
+def convert_pptx_to_pdf_simple(pptx_path: str, pdf_path: str):
+    try:
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import inch
+        import textwrap
+        
+        print(f"Converting PPTX to PDF using simple text extraction: {pptx_path} -> {pdf_path}")
+        
+        prs = load_presentation(pptx_path)
+        
+        pdf_dir = os.path.dirname(pdf_path)
+        if pdf_dir:  # Only create directory if it's not empty
+            os.makedirs(pdf_dir, exist_ok=True)
+        
+        c = canvas.Canvas(pdf_path, pagesize=A4)
+        page_width, page_height = A4
+        
+        for slide_idx, slide_lines in enumerate(presentation_slide_lines(prs)):
+            if slide_idx > 0:
+                c.showPage()
+            
+            c.setFont("Helvetica-Bold", 16)
+            c.drawString(inch, page_height - inch, f"Slide {slide_idx + 1}")
+            
+            y_position = page_height - 1.5 * inch
+            bottom_margin = inch
+            line_step = 15
+            c.setFont("Helvetica", 11)
+            
+            for line in slide_lines:
+                wrapped = textwrap.wrap(line, width=79, break_long_words=False) if len(line) > 80 else (line,)
+                for segment in wrapped:
+                    if y_position <= bottom_margin:
+                        break
+                    c.drawString(inch, y_position, segment)
+                    y_position -= line_step
+            
+            c.setFont("Helvetica", 8)
+            c.drawString(page_width - 1.5*inch, 0.5*inch, f"Page {slide_idx + 1}")
+        
+        write_pdf_bytes(pdf_path, c.getpdfdata())
+        
+        if os.path.exists(pdf_path) and os.path.getsize(pdf_path) > 500:
+            print(f"Successfully converted to PDF using simple method: {pdf_path}")
+            return True
+        else:
+            raise Exception("PDF file was not created properly")
+            
+    except Exception as e:
+        print(f"Simple PDF conversion failed: {e}")
+        return False
+
+@lru_cache(maxsize=1)
+def get_reportlab_styles():
+    """Build the (title, bullet) paragraph styles once; getSampleStyleSheet() is not cheap."""
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.colors import blue
+    
+    styles = getSampleStyleSheet()
+    
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=12,
+        textColor=blue
+    )
+    
+    bullet_style = ParagraphStyle(
+        'CustomBullet',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceAfter=6,
+        leftIndent=20,
+        bulletIndent=10
+    )
+    
+    return title_style, bullet_style
+
+def convert_pptx_to_pdf_with_reportlab(pptx_path: str, pdf_path: str):
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+        import io
+        
+        print(f"Converting PPTX to PDF using ReportLab: {pptx_path} -> {pdf_path}")
+        
+        prs = load_presentation(pptx_path)
+        
+        pdf_buffer = io.BytesIO()
+        doc = SimpleDocTemplate(pdf_buffer, pagesize=A4)
+        story = []
+        title_style, bullet_style = get_reportlab_styles()
+        
+        for slide_num, slide_lines in enumerate(presentation_slide_lines(prs), 1):
+            story.append(Paragraph(f"Slide {slide_num}", title_style))
+            story.append(Spacer(1, 12))
+            
+            for line in slide_lines:
+                story.append(Paragraph(line, bullet_style))
+            
+            story.append(PageBreak())
+        
+        # Every slide ends with a page break; the last one would only add a blank page
+        if story:
+            story.pop()
+        
+        doc.build(story)
+        write_pdf_bytes(pdf_path, pdf_buffer.getbuffer())
+        
+        if os.path.exists(pdf_path) and os.path.getsize(pdf_path) > 1000:
+            print(f"Successfully converted to PDF using ReportLab: {pdf_path}")
+            return True
+        else:
+            raise Exception("PDF file was not created properly")
+            
+    except ImportError as e:
+        print(f"ReportLab not available: {e}")
+        return False
+    except Exception as e:
+        print(f"ReportLab conversion failed: {e}")
+        return False
+
+def convert_text_only_child(pptx_path: str, pdf_path: str):
+    """Child entry point: try ReportLab, then the simple converter, and report through the exit code."""
+    # Both converters share one parse of the deck through load_presentation()
+    for converter in (convert_pptx_to_pdf_with_reportlab, convert_pptx_to_pdf_simple):
+        if converter(pptx_path, pdf_path):
+            sys.exit(0)
+    sys.exit(1)
+
+if __name__ == "__main__":
+    convert_text_only_child(sys.argv[1], sys.argv[2])
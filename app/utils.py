@@ -3,42 +3,77 @@ import sys
 from pathlib import Path
 import platform
 import re
-import traceback
+import time
+import importlib.util
+
+# platform.system() is fixed for the life of the process, so look it up once
+SYSTEM = platform.system()
+IS_LINUX = SYSTEM == "Linux"
+IS_WINDOWS = SYSTEM == "Windows"
 
 current_dir = Path(__file__).parent
 parent_dir = current_dir.parent
 sys.path.insert(0, str(parent_dir))
 
+def get_pdf_backends():
+    """Return the (name, converter) pairs to try, in order, for PPT_PDF_BACKEND (soffice, com or auto)."""
+    backend = os.environ.get('PPT_PDF_BACKEND', 'auto').lower()
+    backends = []
+    if backend == 'com':
+        backends.append(("PowerPoint COM", convert_pptx_to_pdf_com))
+    elif backend == 'soffice' or get_libreoffice_command():
+        backends.append(("LibreOffice", convert_pptx_to_pdf_libreoffice_enhanced))
+    elif IS_WINDOWS:
+        backends.append(("PowerPoint COM", convert_pptx_to_pdf_com))
+    
+    # Text-only fallbacks when no office suite is usable; both need reportlab
+    if HAS_REPORTLAB and PDF_FALLBACK_TIMEOUT > 0:
+        backends.append(("text-only fallback", convert_pptx_to_pdf_text_only))
+    elif HAS_REPORTLAB:
+        backends.append(("ReportLab", convert_pptx_to_pdf_with_reportlab))
+        backends.append(("simple text extraction", convert_pptx_to_pdf_simple))
+    return backends
+
+HAS_REPORTLAB = importlib.util.find_spec('reportlab') is not None
+
+from app.text_pdf import convert_pptx_to_pdf_simple, convert_pptx_to_pdf_with_reportlab
+
+# Run by path rather than as app.text_pdf so the child imports neither the app package nor __main__
+TEXT_PDF_SCRIPT = str(current_dir / 'text_pdf.py')
+
+# Seconds the ReportLab/simple fallbacks may run in their child process; 0 runs them inline
+PDF_FALLBACK_TIMEOUT = float(os.environ.get('PDF_FALLBACK_TIMEOUT', '60'))
+
+def convert_pptx_to_pdf_text_only(pptx_path: str, pdf_path: str):
+    """
+    Run the ReportLab and then the simple converter in one child process, killed after
+    PDF_FALLBACK_TIMEOUT seconds so a pathological deck cannot hold a job thread forever.
+    """
+    import subprocess
+    
+    try:
+        result = subprocess.run(
+            [sys.executable, TEXT_PDF_SCRIPT, pptx_path, pdf_path],
+            timeout=PDF_FALLBACK_TIMEOUT,
+            creationflags=NO_WINDOW_FLAGS
+        )
+    except subprocess.TimeoutExpired:
+        print(f"❌ Text-only PDF conversion timed out after {PDF_FALLBACK_TIMEOUT:.0f}s")
+        return False
+    return result.returncode == 0
+
 def convert_pptx_to_pdf(pptx_path: str, pdf_path: str):
     try:
         print(f"Starting PDF conversion: {pptx_path} -> {pdf_path}")
         
-        # Try LibreOffice first (cross-platform, no watermarks, free)
-        try:
-            success = convert_pptx_to_pdf_libreoffice_enhanced(pptx_path, pdf_path)
-            if success:
-                print("PDF conversion successful using LibreOffice")
-                return True
-        except Exception as e:
-            print(f"LibreOffice method failed: {e}")
-        
-        # Fallback to ReportLab-based extraction
-        try:
-            success = convert_pptx_to_pdf_with_reportlab(pptx_path, pdf_path)
-            if success:
-                print("PDF conversion successful using ReportLab")
-                return True
-        except Exception as e:
-            print(f"ReportLab method failed: {e}")
-        
-        # Final fallback to simple text extraction
-        try:
-            success = convert_pptx_to_pdf_simple(pptx_path, pdf_path)
-            if success:
-                print("PDF conversion successful using simple text extraction")
-                return True
-        except Exception as e:
-            print(f"Simple extraction method failed: {e}")
+        for name, converter in get_pdf_backends():
+            try:
+                success = converter(pptx_path, pdf_path)
+                if success:
+                    print(f"PDF conversion successful using {name}")
+                    return True
+            except Exception as e:
+                print(f"{name} method failed: {e}")
         
         raise Exception("All PDF conversion methods failed")
         
@@ -53,7 +88,6 @@ def convert_pptx_to_pdf_libreoffice_enhanced(pptx_path: str, pdf_path: str):
     """
     try:
         import subprocess
-        import shutil
         import tempfile
         
         print(f"Converting PPTX to PDF using LibreOffice: {pptx_path} -> {pdf_path}")
@@ -62,14 +96,10 @@ def convert_pptx_to_pdf_libreoffice_enhanced(pptx_path: str, pdf_path: str):
         if not os.path.exists(pptx_path):
             raise FileNotFoundError(f"Source PPTX file not found: {pptx_path}")
         
-        # Cross-platform LibreOffice detection
-        libreoffice_cmd = detect_libreoffice_command()
+        # Cross-platform LibreOffice detection, verified once per process
+        libreoffice_cmd = get_libreoffice_command()
         if not libreoffice_cmd:
-            raise Exception("LibreOffice not found on system")
-        
-        # Verify LibreOffice is working
-        if not verify_libreoffice(libreoffice_cmd):
-            raise Exception("LibreOffice verification failed")
+            raise Exception("LibreOffice not found or not working")
         
         # Create output directory if it doesn't exist
         pdf_dir = os.path.dirname(pdf_path)
@@ -80,38 +110,29 @@ def convert_pptx_to_pdf_libreoffice_enhanced(pptx_path: str, pdf_path: str):
         pptx_abs_path = os.path.abspath(pptx_path)
         pdf_abs_path = os.path.abspath(pdf_path)
         
+        # Prefer the warm unoserver daemon; a fresh soffice costs seconds of startup
+        if ensure_unoserver(libreoffice_cmd):
+            if convert_with_unoserver(pptx_abs_path, pdf_abs_path):
+                return True
+            print("⚠️ unoserver conversion failed, falling back to a one-shot LibreOffice process")
+        
         # Use temporary directory for conversion
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Ensure clean LibreOffice state
-            cleanup_libreoffice_processes()
-            
-            # Create automated LibreOffice profile to prevent first-run dialogs
-            profile_dir = os.path.join(temp_dir, 'libreoffice_profile')
-            create_automated_libreoffice_profile(profile_dir)
-            
+        # Each running conversion checks out its own persistent profile, so conversions
+        # run side by side and later ones skip LibreOffice's first-start profile setup
+        # Converting next to the destination keeps the final move a same-filesystem rename
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(pdf_abs_path)) as temp_dir, libreoffice_profile() as profile_dir:
             # Build LibreOffice command
             cmd = build_libreoffice_command(libreoffice_cmd, pptx_abs_path, temp_dir)
             
             print(f"Executing LibreOffice command: {' '.join(cmd)}")
             
             try:
-                # Update environment for temporary profile
+                # Point LibreOffice at the checked-out profile
                 libreoffice_env = get_libreoffice_env()
                 libreoffice_env['UserInstallation'] = f'file:///{profile_dir.replace(os.sep, "/")}'
                 
-                # Execute conversion with maximum automation and timeout
-                result = subprocess.run(
-                    cmd,
-                    text=True,
-                    timeout=180,                    # 3 minutes timeout
-                    cwd=temp_dir,
-                    stdin=subprocess.DEVNULL,       # Completely block interactive input
-                    stdout=subprocess.PIPE,         # Capture all output
-                    stderr=subprocess.PIPE,         # Capture all errors
-                    env=libreoffice_env,            # Use our automated environment
-                    shell=False,                    # Don't use shell for security
-                    creationflags=subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0  # Hide window on Windows
-                )
+                # Execute conversion with maximum automation and a 3 minute timeout
+                result = run_libreoffice(cmd, timeout=180, cwd=temp_dir, env=libreoffice_env)
                 
                 if result.stdout:
                     print(f"LibreOffice stdout: {result.stdout.strip()}")
@@ -125,7 +146,7 @@ def convert_pptx_to_pdf_libreoffice_enhanced(pptx_path: str, pdf_path: str):
                     
                     if os.path.exists(generated_pdf):
                         # Move to final destination
-                        shutil.move(generated_pdf, pdf_abs_path)
+                        move_into_place(generated_pdf, pdf_abs_path)
                         
                         # Verify successful conversion
                         if os.path.exists(pdf_abs_path) and os.path.getsize(pdf_abs_path) > 1000:
@@ -150,20 +171,284 @@ def convert_pptx_to_pdf_libreoffice_enhanced(pptx_path: str, pdf_path: str):
                     
             except subprocess.TimeoutExpired:
                 print("❌ LibreOffice conversion timed out after 3 minutes")
-                cleanup_libreoffice_processes()  # Clean up hanging processes
                 return False
             except Exception as subprocess_error:
                 print(f"❌ Subprocess error: {subprocess_error}")
-                cleanup_libreoffice_processes()  # Clean up hanging processes
                 return False
-            finally:
-                # Always attempt cleanup after conversion
-                cleanup_libreoffice_processes()
         
     except Exception as e:
         print(f"❌ LibreOffice conversion failed: {e}")
         return False
 
+import atexit
+import socket
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+UNOSERVER_PORT = int(os.environ.get('UNOSERVER_PORT', '2003'))
+UNOSERVER_PROFILE = 'file:///tmp/uno_profile'
+_unoserver_process = None
+_unoserver_lock = threading.Lock()
+
+def _unoserver_listening(timeout: float = 0.5) -> bool:
+    try:
+        with socket.create_connection(('127.0.0.1', UNOSERVER_PORT), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+def _stop_unoserver():
+    if _unoserver_process is not None and _unoserver_process.poll() is None:
+        _unoserver_process.terminate()
+        try:
+            _unoserver_process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            _unoserver_process.kill()
+
+def ensure_unoserver(libreoffice_cmd: str, startup_timeout: float = 30.0) -> bool:
+    """
+    Start (once) a persistent unoserver daemon and report whether it is accepting conversions.
+    A server already listening on UNOSERVER_PORT, e.g. from a sibling worker, is reused.
+    """
+    global _unoserver_process
+    import shutil
+    
+    if not (shutil.which('unoserver') and shutil.which('unoconvert')):
+        return False
+    
+    with _unoserver_lock:
+        if _unoserver_process is not None and _unoserver_process.poll() is None:
+            return True
+        if _unoserver_listening():
+            return True
+        
+        print(f"Starting unoserver on port {UNOSERVER_PORT}")
+        try:
+            _unoserver_process = subprocess.Popen(
+                [
+                    'unoserver',
+                    '--port', str(UNOSERVER_PORT),
+                    '--executable', shutil.which(libreoffice_cmd) or libreoffice_cmd,
+                    '--user-installation', UNOSERVER_PROFILE
+                ],
+                env=get_libreoffice_env(),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            print(f"❌ Could not start unoserver: {e}")
+            return False
+        atexit.register(_stop_unoserver)
+        
+        deadline = time.monotonic() + startup_timeout
+        while time.monotonic() < deadline:
+            if _unoserver_process.poll() is not None:
+                print(f"❌ unoserver exited with code {_unoserver_process.returncode}")
+                return False
+            if _unoserver_listening():
+                print("✅ unoserver is ready")
+                return True
+            time.sleep(0.25)
+        
+        print("❌ unoserver did not start listening in time")
+        return False
+
+def convert_with_unoserver(pptx_abs_path: str, pdf_abs_path: str) -> bool:
+    """Convert through the running unoserver daemon with unoconvert."""
+    try:
+        result = subprocess.run(
+            ['unoconvert', '--port', str(UNOSERVER_PORT), '--convert-to', 'pdf', pptx_abs_path, pdf_abs_path],
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+            timeout=180
+        )
+    except subprocess.TimeoutExpired:
+        print("❌ unoconvert timed out after 3 minutes")
+        return False
+    
+    if result.returncode != 0:
+        print(f"❌ unoconvert failed with return code {result.returncode}: {result.stderr.strip()}")
+        return False
+    if os.path.exists(pdf_abs_path) and os.path.getsize(pdf_abs_path) > 1000:
+        print(f"✅ PDF conversion successful via unoserver! 📄 Output file: {pdf_abs_path}")
+        return True
+    return False
+
+LIBREOFFICE_DEBUG_OUTPUT = os.environ.get('SMARTSLIDE_DEBUG_LO') == '1'
+
+# Hide the console window soffice would otherwise open on Windows
+NO_WINDOW_FLAGS = subprocess.CREATE_NO_WINDOW if IS_WINDOWS else 0
+
+def run_libreoffice(cmd, timeout, cwd, env=None):
+    """
+    Run one soffice command headless and return its CompletedProcess.
+    Every conversion has its own profile, so instead of killing all soffice processes
+    on timeout only this command's process tree is killed (soffice forks soffice.bin).
+    """
+    process = subprocess.Popen(
+        cmd,
+        text=True,
+        cwd=cwd,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        # stdout is only progress chatter; keep stderr for diagnosing failures
+        stdout=subprocess.PIPE if LIBREOFFICE_DEBUG_OUTPUT else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        creationflags=NO_WINDOW_FLAGS,
+        start_new_session=not IS_WINDOWS
+    )
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        if IS_WINDOWS:
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)], capture_output=True, timeout=10)
+        else:
+            import signal
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        process.communicate()
+        raise
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+_free_libreoffice_profiles = []
+_libreoffice_profile_count = 0
+_libreoffice_profile_lock = threading.Lock()
+
+@contextmanager
+def libreoffice_profile():
+    """
+    Check out a persistent, pre-configured LibreOffice profile directory for one soffice run.
+    A profile is only used by one process at a time; new ones are created when all are busy.
+    """
+    global _libreoffice_profile_count
+    with _libreoffice_profile_lock:
+        if _free_libreoffice_profiles:
+            profile_dir = _free_libreoffice_profiles.pop()
+        else:
+            # Keyed by pid as well, since gunicorn workers fork after import
+            profile_dir = os.path.join(tempfile.gettempdir(), f"smartslide_lo_profile_{os.getpid()}_{_libreoffice_profile_count}")
+            _libreoffice_profile_count += 1
+    
+    if not os.path.exists(os.path.join(profile_dir, 'user', 'registrymodifications.xcu')):
+        create_automated_libreoffice_profile(profile_dir)
+    try:
+        yield profile_dir
+    finally:
+        with _libreoffice_profile_lock:
+            _free_libreoffice_profiles.append(profile_dir)
+
+def move_into_place(src: str, dst: str):
+    """Rename src over dst; across filesystems, stream-copy it in 1 MiB chunks instead."""
+    import errno
+    import shutil
+    
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        with open(src, 'rb') as source, open(dst, 'wb') as target:
+            shutil.copyfileobj(source, target, length=1 << 20)
+        os.unlink(src)
+
+LIBREOFFICE_BATCH_SIZE = 10
+LIBREOFFICE_WORKERS = int(os.environ.get('LIBREOFFICE_WORKERS', min(os.cpu_count() or 1, 4)))
+
+def convert_many_pptx_to_pdf(pairs: List[Tuple[str, str]]) -> Dict[str, bool]:
+    """
+    Convert several (pptx_path, pdf_path) pairs, sharing one LibreOffice start-up per batch
+    and running up to LIBREOFFICE_WORKERS batches at once, each with its own profile.
+    Returns {pptx_path: success}. Files left unconverted by a failed or timed-out batch
+    are retried one at a time.
+    """
+    results = {pptx_path: False for pptx_path, _ in pairs}
+    libreoffice_cmd = get_libreoffice_command()
+    if not libreoffice_cmd:
+        print("❌ LibreOffice not found or not working")
+        return results
+    
+    # A warm unoserver already avoids the start-up cost, so batching buys nothing there
+    if ensure_unoserver(libreoffice_cmd):
+        for pptx_path, pdf_path in pairs:
+            results[pptx_path] = convert_pptx_to_pdf_libreoffice_enhanced(pptx_path, pdf_path)
+        return results
+    
+    # Spread small jobs over the workers, but never more than LIBREOFFICE_BATCH_SIZE per run
+    workers = max(1, LIBREOFFICE_WORKERS)
+    batch_size = max(1, min(LIBREOFFICE_BATCH_SIZE, -(-len(pairs) // workers)))
+    
+    # soffice names each output <stem>.pdf, so a batch must not repeat a stem
+    batches = []
+    for pptx_path, pdf_path in pairs:
+        stem = os.path.splitext(os.path.basename(pptx_path))[0]
+        if not batches or len(batches[-1]) >= batch_size or stem in batches[-1]:
+            batches.append({})
+        batches[-1][stem] = (os.path.abspath(pptx_path), os.path.abspath(pdf_path), pptx_path)
+    
+    with ThreadPoolExecutor(max_workers=min(workers, len(batches)) or 1, thread_name_prefix='soffice') as pool:
+        for batch_results in pool.map(lambda batch: _convert_libreoffice_batch(libreoffice_cmd, batch), batches):
+            results.update(batch_results)
+    
+    return results
+
+def _convert_libreoffice_batch(libreoffice_cmd: str, batch: Dict[str, Tuple[str, str, str]]) -> Dict[str, bool]:
+    results = {}
+    inputs = [pptx_abs_path for pptx_abs_path, _, _ in batch.values()]
+    output_dir = os.path.dirname(next(iter(batch.values()))[1])
+    os.makedirs(output_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=output_dir) as temp_dir, libreoffice_profile() as profile_dir:
+        cmd = build_libreoffice_command(libreoffice_cmd, inputs[0], temp_dir) + inputs[1:]
+        libreoffice_env = get_libreoffice_env()
+        libreoffice_env['UserInstallation'] = f'file:///{profile_dir.replace(os.sep, "/")}'
+        
+        print(f"Converting {len(inputs)} PPTX files in one LibreOffice run")
+        try:
+            run_libreoffice(cmd, timeout=120 + 60 * len(inputs), cwd=temp_dir, env=libreoffice_env)
+        except subprocess.TimeoutExpired:
+            print("❌ Batch LibreOffice conversion timed out, retrying remaining files individually")
+        
+        for stem, (_, pdf_abs_path, pptx_path) in batch.items():
+            generated_pdf = os.path.join(temp_dir, f"{stem}.pdf")
+            if os.path.exists(generated_pdf) and os.path.getsize(generated_pdf) > 1000:
+                os.makedirs(os.path.dirname(pdf_abs_path), exist_ok=True)
+                move_into_place(generated_pdf, pdf_abs_path)
+                results[pptx_path] = True
+    
+    for pptx_abs_path, pdf_abs_path, pptx_path in batch.values():
+        if not results.get(pptx_path):
+            results[pptx_path] = convert_pptx_to_pdf_libreoffice_enhanced(pptx_abs_path, pdf_abs_path)
+    return results
+
+_libreoffice_command = None
+
+def get_libreoffice_command():
+    """
+    Return the detected and verified LibreOffice command, or None.
+    The lookup and version check run once per process.
+    """
+    global _libreoffice_command
+    if _libreoffice_command is None:
+        libreoffice_cmd = detect_libreoffice_command()
+        _libreoffice_command = libreoffice_cmd if libreoffice_cmd and verify_libreoffice(libreoffice_cmd) else ''
+    return _libreoffice_command or None
+
+def reset_libreoffice_command():
+    """Forget the detected LibreOffice binary, e.g. after installing it or changing PATH."""
+    global _libreoffice_command
+    _libreoffice_command = None
+    detect_libreoffice_command.cache_clear()
+    verify_libreoffice.cache_clear()
+
+@lru_cache(maxsize=1)
 def detect_libreoffice_command():
     """
     Detect LibreOffice command across different platforms.
@@ -171,7 +456,7 @@ def detect_libreoffice_command():
     """
     import shutil
     
-    system = platform.system()
+    system = SYSTEM
     
     # Platform-specific LibreOffice paths and commands
     if system == "Darwin":  # macOS
@@ -239,6 +524,7 @@ def detect_libreoffice_command():
         print("💡 For Linux VPS, install with: sudo apt update && sudo apt install libreoffice --no-install-recommends")
     return None
 
+@lru_cache(maxsize=4)
 def verify_libreoffice(libreoffice_cmd):
     """
     Verify that LibreOffice is working properly.
@@ -266,13 +552,21 @@ def verify_libreoffice(libreoffice_cmd):
         print(f"❌ LibreOffice verification error: {e}")
         return False
 
+# Linux VPS-specific parameters for maximum compatibility
+LIBREOFFICE_LINUX_FLAGS = (
+    '--nodefault',                       # Don't open default document
+    '--nocrashreport',                   # Disable crash reporting
+    '--disable-extension-update',        # Disable extension updates
+) if IS_LINUX else ()
+
 def build_libreoffice_command(libreoffice_cmd, input_file, output_dir):
     """
     Build LibreOffice command with proven automation parameters that work reliably.
     Optimized for headless Linux VPS and local environments.
     """
-    cmd = [
+    return [
         libreoffice_cmd,
+        *LIBREOFFICE_LINUX_FLAGS,
         '--headless',                    # No GUI - ESSENTIAL
         '--invisible',                   # Hide splash screen
         '--nolockcheck',                 # Don't check for lock files
@@ -283,15 +577,6 @@ def build_libreoffice_command(libreoffice_cmd, input_file, output_dir):
         '--outdir', output_dir,          # Output directory
         input_file                       # Input file
     ]
-    
-    # Add Linux VPS-specific parameters for maximum compatibility
-    import platform
-    if platform.system() == "Linux":
-        cmd.insert(1, '--nodefault')     # Don't open default document
-        cmd.insert(2, '--nocrashreport') # Disable crash reporting
-        cmd.insert(3, '--disable-extension-update') # Disable extension updates
-    
-    return cmd
 
 def get_libreoffice_env():
     """
@@ -309,7 +594,7 @@ def get_libreoffice_env():
     })
     
     # Platform-specific essential settings
-    system = platform.system()
+    system = SYSTEM
     if system == "Linux":
         # Enhanced Linux VPS support - headless server environment
         env.update({
@@ -337,13 +622,38 @@ def get_libreoffice_env():
     
     return env
 
+LIBREOFFICE_PROCESS_NAMES = frozenset(('soffice', 'soffice.bin', 'soffice.exe', 'oosplash'))
+
 def cleanup_libreoffice_processes():
     """
-    Clean up any hanging LibreOffice processes to prevent conflicts.
+    Clean up hanging LibreOffice processes started by this worker.
+    With psutil only our own descendants are killed, sparing sibling workers'
+    conversions and the unoserver daemon; without it, fall back to pkill/taskkill.
     """
     try:
-        import subprocess
-        system = platform.system()
+        import psutil
+    except ImportError:
+        psutil = None
+    
+    try:
+        if psutil is not None:
+            keep = set()
+            if _unoserver_process is not None and _unoserver_process.poll() is None:
+                try:
+                    daemon = psutil.Process(_unoserver_process.pid)
+                    keep = {daemon.pid, *(child.pid for child in daemon.children(recursive=True))}
+                except psutil.Error:
+                    pass
+            
+            for child in psutil.Process().children(recursive=True):
+                try:
+                    if child.pid not in keep and child.name() in LIBREOFFICE_PROCESS_NAMES:
+                        child.kill()
+                except psutil.Error:
+                    pass
+            return
+        
+        system = SYSTEM
         
         if system == "Windows":
             # Kill LibreOffice processes on Windows
@@ -405,159 +715,92 @@ def create_automated_libreoffice_profile(profile_dir):
         print(f"⚠️ Warning: Could not create LibreOffice profile: {e}")
         return False
 
-def convert_pptx_to_pdf_simple(pptx_path: str, pdf_path: str):
-    try:
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib.units import inch
-        from pptx import Presentation
-        
-        print(f"Converting PPTX to PDF using simple text extraction: {pptx_path} -> {pdf_path}")
-        
-        prs = Presentation(pptx_path)
-        
-        pdf_dir = os.path.dirname(pdf_path)
-        if pdf_dir:  # Only create directory if it's not empty
-            os.makedirs(pdf_dir, exist_ok=True)
-        
-        c = canvas.Canvas(pdf_path, pagesize=A4)
-        page_width, page_height = A4
-        
-        for slide_idx, slide in enumerate(prs.slides):
-            if slide_idx > 0:
-                c.showPage()
-            
-            c.setFont("Helvetica-Bold", 16)
-            c.drawString(inch, page_height - inch, f"Slide {slide_idx + 1}")
-            
-            y_position = page_height - 1.5 * inch
-            c.setFont("Helvetica", 11)
-            
-            for shape in slide.shapes:
-                try:
-                    if hasattr(shape, 'text') and shape.text.strip():
-                        text = shape.text.strip()
-                        lines = text.split('\n')
-                        
-                        for line in lines:
-                            if line.strip() and y_position > inch:
-                                if len(line) > 80:
-                                    words = line.split(' ')
-                                    current_line = ''
-                                    for word in words:
-                                        if len(current_line + ' ' + word) < 80:
-                                            current_line += (' ' if current_line else '') + word
-                                        else:
-                                            if current_line:
-                                                c.drawString(inch, y_position, current_line)
-                                                y_position -= 15
-                                            current_line = word
-                                    if current_line and y_position > inch:
-                                        c.drawString(inch, y_position, current_line)
-                                        y_position -= 15
-                                else:
-                                    c.drawString(inch, y_position, line.strip())
-                                    y_position -= 15
-                
-                except Exception as shape_error:
-                    print(f"Error processing shape: {shape_error}")
-                    continue
-            
-            c.setFont("Helvetica", 8)
-            c.drawString(page_width - 1.5*inch, 0.5*inch, f"Page {slide_idx + 1}")
-        
-        c.save()
-        
-        if os.path.exists(pdf_path) and os.path.getsize(pdf_path) > 500:
-            print(f"Successfully converted to PDF using simple method: {pdf_path}")
-            return True
-        else:
-            raise Exception("PDF file was not created properly")
-            
-    except Exception as e:
-        print(f"Simple PDF conversion failed: {e}")
-        return False
+def _init_powerpoint_thread():
+    import comtypes
+    comtypes.CoInitialize()
 
-def convert_pptx_to_pdf_with_reportlab(pptx_path: str, pdf_path: str):
+# PowerPoint COM objects are apartment-bound, so one long-lived thread owns the
+# application instance and every conversion is queued onto it.
+_powerpoint_executor = ThreadPoolExecutor(
+    max_workers=1,
+    thread_name_prefix='powerpoint',
+    initializer=_init_powerpoint_thread
+)
+_powerpoint_app = None
+
+def _get_powerpoint_app():
+    global _powerpoint_app
+    if _powerpoint_app is None:
+        import comtypes.client
+        powerpoint = comtypes.client.CreateObject("Powerpoint.Application")
+        powerpoint.Visible = False
+        powerpoint.DisplayAlerts = False
+        _powerpoint_app = powerpoint
+    return _powerpoint_app
+
+def _wait_for_pdf(path: str, interval: float = 0.1, timeout: float = 30.0) -> int:
+    """
+    Poll path until it starts with %PDF- and two consecutive sizes match.
+    Returns the final size, or 0 if that never happens before timeout.
+    """
+    import time
+    
+    deadline = time.monotonic() + timeout
+    last_size = -1
+    while time.monotonic() < deadline:
+        try:
+            with open(path, 'rb') as fh:
+                header = fh.read(5)
+                size = os.fstat(fh.fileno()).st_size
+        except OSError:
+            header, size = b'', -1
+        if header == b'%PDF-' and size == last_size:
+            return size
+        last_size = size
+        time.sleep(interval)
+    return 0
+
+def _export_with_powerpoint(pptx_abs_path: str, pdf_abs_path: str) -> int:
+    global _powerpoint_app
+    
     try:
-        from pptx import Presentation
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.lib.utils import ImageReader
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.lib.colors import black, blue
-        import io
-        from PIL import Image
-        
-        print(f"Converting PPTX to PDF using ReportLab: {pptx_path} -> {pdf_path}")
-        
-        prs = Presentation(pptx_path)
-        
-        doc = SimpleDocTemplate(pdf_path, pagesize=A4)
-        story = []
-        styles = getSampleStyleSheet()
-        
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            spaceAfter=12,
-            textColor=blue
+        presentation = _get_powerpoint_app().Presentations.Open(
+            pptx_abs_path, 
+            ReadOnly=True, 
+            Untitled=False, 
+            WithWindow=False
         )
-        
-        bullet_style = ParagraphStyle(
-            'CustomBullet',
-            parent=styles['Normal'],
-            fontSize=12,
-            spaceAfter=6,
-            leftIndent=20,
-            bulletIndent=10
+    except Exception:
+        # PowerPoint may have been closed underneath us; start a fresh one next time
+        _powerpoint_app = None
+        raise
+    
+    try:
+        presentation.ExportAsFixedFormat(
+            OutputFileName=pdf_abs_path,
+            FixedFormatType=2,
+            Intent=1,
+            FrameSlides=False,
+            HandoutOrder=1,
+            OutputType=1,
+            PrintHiddenSlides=False,
+            PrintRange=None,
+            RangeType=1,
+            SlideShowName="",
+            IncludeDocProps=True,
+            KeepIRMSettings=True,
+            DocStructureTags=True,
+            BitmapMissingFonts=True,
+            UseDocumentICCProfile=False
         )
-        
-        for slide_num, slide in enumerate(prs.slides, 1):
-            story.append(Paragraph(f"Slide {slide_num}", title_style))
-            story.append(Spacer(1, 12))
-            
-            slide_text = []
-            for shape in slide.shapes:
-                if hasattr(shape, "text") and shape.text.strip():
-                    text = shape.text.strip()
-                    if text:
-                        slide_text.append(text)
-            
-            for text in slide_text:
-                lines = text.split('\n')
-                for line in lines:
-                    if line.strip():
-                        story.append(Paragraph(line.strip(), bullet_style))
-            
-            if slide_num < len(prs.slides):
-                story.append(PageBreak())
-        
-        doc.build(story)
-        
-        if os.path.exists(pdf_path) and os.path.getsize(pdf_path) > 1000:
-            print(f"Successfully converted to PDF using ReportLab: {pdf_path}")
-            return True
-        else:
-            raise Exception("PDF file was not created properly")
-            
-    except ImportError as e:
-        print(f"ReportLab not available: {e}")
-        return False
-    except Exception as e:
-        print(f"ReportLab conversion failed: {e}")
-        return False
+    finally:
+        presentation.Close()
+    
+    return _wait_for_pdf(pdf_abs_path)
 
 def convert_pptx_to_pdf_com(pptx_path: str, pdf_path: str):
     try:
-        import comtypes.client
         import comtypes
-        import time
-        
-        comtypes.CoInitialize()
         
         pptx_abs_path = os.path.abspath(pptx_path)
         pdf_abs_path = os.path.abspath(pdf_path)
@@ -567,66 +810,16 @@ def convert_pptx_to_pdf_com(pptx_path: str, pdf_path: str):
         
         print(f"Converting {pptx_abs_path} to {pdf_abs_path}")
         
-        powerpoint = None
-        presentation = None
+        pdf_dir = os.path.dirname(pdf_abs_path)
+        os.makedirs(pdf_dir, exist_ok=True)
         
-        try:
-            powerpoint = comtypes.client.CreateObject("Powerpoint.Application")
-            powerpoint.Visible = False
-            powerpoint.DisplayAlerts = False
-            time.sleep(1)
-            
-            presentation = powerpoint.Presentations.Open(
-                pptx_abs_path, 
-                ReadOnly=True, 
-                Untitled=False, 
-                WithWindow=False
-            )
-            time.sleep(1)
-            
-            pdf_dir = os.path.dirname(pdf_abs_path)
-            os.makedirs(pdf_dir, exist_ok=True)
-            
-            presentation.ExportAsFixedFormat(
-                OutputFileName=pdf_abs_path,
-                FixedFormatType=2,
-                Intent=1,
-                FrameSlides=False,
-                HandoutOrder=1,
-                OutputType=1,
-                PrintHiddenSlides=False,
-                PrintRange=None,
-                RangeType=1,
-                SlideShowName="",
-                IncludeDocProps=True,
-                KeepIRMSettings=True,
-                DocStructureTags=True,
-                BitmapMissingFonts=True,
-                UseDocumentICCProfile=False
-            )
-            
-            time.sleep(2)
-            
-            if os.path.exists(pdf_abs_path) and os.path.getsize(pdf_abs_path) > 1000:
-                print(f"Successfully converted to PDF using COM: {pdf_abs_path}")
-                return True
-            else:
-                raise Exception("PDF file was not created properly")
-                
-        finally:
-            try:
-                if presentation:
-                    presentation.Close()
-                if powerpoint:
-                    powerpoint.Quit()
-                time.sleep(1)
-            except:
-                pass
-            
-            try:
-                comtypes.CoUninitialize()
-            except:
-                pass
+        pdf_size = _powerpoint_executor.submit(_export_with_powerpoint, pptx_abs_path, pdf_abs_path).result()
+        
+        if pdf_size > 1000:
+            print(f"Successfully converted to PDF using COM: {pdf_abs_path}")
+            return True
+        else:
+            raise Exception("PDF file was not created properly")
                 
     except ImportError:
         print("comtypes not available for PDF conversion")
@@ -637,24 +830,8 @@ def convert_pptx_to_pdf_com(pptx_path: str, pdf_path: str):
 
 def convert_pptx_to_pdf_libreoffice(pptx_path: str, pdf_path: str):
     try:
-        import subprocess
-        import shutil
-        
-        libreoffice_cmd = None
-        for cmd in ['libreoffice', 'soffice']:
-            if shutil.which(cmd):
-                libreoffice_cmd = cmd
-                break
-        
+        libreoffice_cmd = get_libreoffice_command()
         if not libreoffice_cmd:
-            print("LibreOffice not found in PATH")
-            return False
-            
-        try:
-            result = subprocess.run([libreoffice_cmd, '--version'], 
-                                    capture_output=True, check=True, timeout=10)
-            print(f"Found LibreOffice: {result.stdout.decode().strip()}")
-        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
             print("LibreOffice not available or not responding")
             return False
         
@@ -667,7 +844,7 @@ def convert_pptx_to_pdf_libreoffice(pptx_path: str, pdf_path: str):
         os.makedirs(pdf_dir, exist_ok=True)
         
         import tempfile
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with tempfile.TemporaryDirectory(dir=pdf_dir) as temp_dir:
             cmd = [
                 libreoffice_cmd,
                 '--headless',
@@ -682,13 +859,7 @@ def convert_pptx_to_pdf_libreoffice(pptx_path: str, pdf_path: str):
             ]
             
             try:
-                result = subprocess.run(
-                    cmd, 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=120,
-                    cwd=temp_dir
-                )
+                result = run_libreoffice(cmd, timeout=120, cwd=temp_dir)
                 
                 print(f"LibreOffice command: {' '.join(cmd)}")
                 print(f"Return code: {result.returncode}")
@@ -704,7 +875,7 @@ def convert_pptx_to_pdf_libreoffice(pptx_path: str, pdf_path: str):
                     print(f"Looking for generated PDF: {generated_pdf}")
                     
                     if os.path.exists(generated_pdf):
-                        shutil.move(generated_pdf, pdf_abs_path)
+                        move_into_place(generated_pdf, pdf_abs_path)
                         
                         if os.path.exists(pdf_abs_path) and os.path.getsize(pdf_abs_path) > 1000:
                             print(f"Successfully converted to PDF using LibreOffice: {pdf_abs_path}")
@@ -738,20 +909,29 @@ try:
 except ImportError:
     print("Warning: python-dotenv not installed, environment variables might not load")
 
+import asyncio
 import json
 import tempfile
 import threading
+import time
 import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from heapq import nlargest
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from queue import SimpleQueue
 from datetime import datetime, timedelta
 import logging
 from typing import Dict, List, Optional, Any
-import traceback
+import zipfile
+
+from langchain.prompts import PromptTemplate
 
 try:
     from ppt_maker_flo import (
         ChatGoogleGenerativeAI,
-        create_enhanced_ppt,
-        parse_slides_enhanced,
+        create_enhanced_ppt_from_text,
         extract_text_from_llm_output,
         create_enhanced_few_shot_prompt,
         predict_num_slides,
@@ -764,10 +944,67 @@ except ImportError as e:
     print("Python path:", sys.path)
     raise
 
+from app.llm_cache import LLMCache
+from app.mermaid_emit import emit as emit_mermaid
+
+try:
+    from google.generativeai import caching
+except ImportError:
+    caching = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional extraction and client libraries, resolved once at import time
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+try:
+    import pdfplumber
+except ImportError:
+    pdfplumber = None
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+try:
+    from docx import Document as DocxDocument
+except ImportError:
+    DocxDocument = None
+
+try:
+    import magic
+except ImportError:
+    magic = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-if os.environ.get('DYNO'):
+ON_HEROKU = bool(os.environ.get('DYNO'))
+UPLOADS_DIR = '/tmp' if ON_HEROKU else os.path.join(os.getcwd(), 'uploads')
+OUTPUTS_DIR = '/tmp' if ON_HEROKU else os.path.join(os.getcwd(), 'outputs')
+CACHE_DIR = '/tmp/smartslide-cache' if ON_HEROKU else os.path.join(os.getcwd(), 'cache')
+os.makedirs(UPLOADS_DIR, exist_ok=True)
+os.makedirs(OUTPUTS_DIR, exist_ok=True)
+
+if ON_HEROKU:
     import logging
     logging.basicConfig(
         level=logging.INFO,
@@ -778,78 +1015,510 @@ if os.environ.get('DYNO'):
     logger.info(f"Memory usage: {psutil.virtual_memory().percent}%")
     logger.info(f"Available memory: {psutil.virtual_memory().available / 1024 / 1024:.1f} MB")
 
-active_jobs: Dict[str, Dict] = {}
-job_results: Dict[str, Dict] = {}
+FINISHED_STATUSES = frozenset({'completed', 'failed'})
+
+def _evictable(value) -> bool:
+    """Job records still running are never evicted for size; anything else is."""
+    return not isinstance(value, dict) or value.get('status', 'failed') in FINISHED_STATUSES
+
+class JobStore(OrderedDict):
+    """Insertion-ordered job dict that evicts finished entries past maxsize and any entry older than ttl seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._inserted: OrderedDict = OrderedDict()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._inserted.pop(key, None)
+        self._inserted[key] = time.monotonic()
+        self.expire()
+
+    def expire(self):
+        cutoff = time.monotonic() - self.ttl
+        while self._inserted:
+            key, inserted_at = next(iter(self._inserted.items()))
+            if key in self and inserted_at >= cutoff:
+                break
+            self._inserted.popitem(last=False)
+            self.pop(key, None)
+        overflow = len(self) - self.maxsize
+        if overflow > 0:
+            victims = [key for key in self._inserted if _evictable(self.get(key))][:overflow]
+            for key in victims:
+                del self._inserted[key]
+                self.pop(key, None)
+
+JOB_SHARDS = 64
+_shard_locks = tuple(threading.RLock() for _ in range(JOB_SHARDS))
+
+def _shard_index(job_id: str) -> int:
+    return hash(job_id) % JOB_SHARDS
+
+def job_lock(job_id: str):
+    """Return the lock guarding job_id's entries in every ShardedJobStore."""
+    return _shard_locks[_shard_index(job_id)]
+
+class ShardedJobStore:
+    """Job dict split into JOB_SHARDS JobStores so updates to different jobs take different locks."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        # Per-shard cap; shards overfill rather than drop jobs that are still running
+        shard_size = max(1, maxsize // JOB_SHARDS)
+        self._shards = tuple(JobStore(maxsize=shard_size, ttl=ttl) for _ in range(JOB_SHARDS))
+
+    def _locate(self, job_id):
+        index = _shard_index(job_id)
+        return _shard_locks[index], self._shards[index]
+
+    def __getitem__(self, job_id):
+        lock, shard = self._locate(job_id)
+        with lock:
+            return shard[job_id]
+
+    def __setitem__(self, job_id, value):
+        lock, shard = self._locate(job_id)
+        with lock:
+            shard[job_id] = value
+
+    def __delitem__(self, job_id):
+        lock, shard = self._locate(job_id)
+        with lock:
+            del shard[job_id]
+
+    def __contains__(self, job_id):
+        lock, shard = self._locate(job_id)
+        with lock:
+            return job_id in shard
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def get(self, job_id, default=None):
+        lock, shard = self._locate(job_id)
+        with lock:
+            return shard.get(job_id, default)
+
+    def pop(self, job_id, default=None):
+        lock, shard = self._locate(job_id)
+        with lock:
+            return shard.pop(job_id, default)
+
+    def items(self):
+        snapshot = []
+        for lock, shard in zip(_shard_locks, self._shards):
+            with lock:
+                snapshot.extend(shard.items())
+        return snapshot
+
+    def keys(self):
+        return [job_id for job_id, _ in self.items()]
+
+    def recent(self, count: int):
+        """Return the count newest (job_id, job) pairs by created_at_ns, newest first."""
+        return nlargest(count, self.items(), key=lambda item: item[1].get('created_at_ns', 0))
+
+    def update(self, job_id, fields):
+        lock, shard = self._locate(job_id)
+        with lock:
+            job = shard.get(job_id)
+            if job is not None:
+                job.update(fields)
+            return job
+
+    def expire(self):
+        for lock, shard in zip(_shard_locks, self._shards):
+            with lock:
+                shard.expire()
+
+class RedisJobStore:
+    """ShardedJobStore interface over Redis so job state outlives the process.
+
+    Each job is a JSON string under "<prefix>:<job_id>" with a TTL; a sorted set
+    "<prefix>:index" scored by created_at_ns (first write time if absent) backs
+    len/keys/items, so recent() orders jobs the same way ShardedJobStore does.
+    """
+
+    def __init__(self, client, prefix: str, ttl: int):
+        self._redis = client
+        self._prefix = prefix
+        self._ttl = ttl
+        self._index = f"{prefix}:index"
+
+    def _key(self, job_id):
+        return f"{self._prefix}:{job_id}"
+
+    @staticmethod
+    def _encode(value):
+        if orjson is not None:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(value)
+
+    @staticmethod
+    def _decode(raw):
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+    def __getitem__(self, job_id):
+        value = self.get(job_id)
+        if value is None:
+            raise KeyError(job_id)
+        return value
+
+    def __setitem__(self, job_id, value):
+        pipe = self._redis.pipeline()
+        pipe.set(self._key(job_id), self._encode(value), ex=self._ttl)
+        # nx keeps the creation score; progress writes must not reorder the index
+        pipe.zadd(self._index, {job_id: value.get('created_at_ns') or time.time_ns()}, nx=True)
+        pipe.execute()
+
+    def __delitem__(self, job_id):
+        if self.pop(job_id) is None:
+            raise KeyError(job_id)
+
+    def __contains__(self, job_id):
+        return bool(self._redis.exists(self._key(job_id)))
+
+    def __len__(self):
+        self.expire()
+        return self._redis.zcard(self._index)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def get(self, job_id, default=None):
+        raw = self._redis.get(self._key(job_id))
+        return self._decode(raw) if raw is not None else default
+
+    def pop(self, job_id, default=None):
+        pipe = self._redis.pipeline()
+        pipe.get(self._key(job_id))
+        pipe.delete(self._key(job_id))
+        pipe.zrem(self._index, job_id)
+        raw = pipe.execute()[0]
+        return self._decode(raw) if raw is not None else default
+
+    def items(self):
+        self.expire()
+        job_ids = [job_id.decode() for job_id in self._redis.zrange(self._index, 0, -1)]
+        if not job_ids:
+            return []
+        values = self._redis.mget([self._key(job_id) for job_id in job_ids])
+        return [(job_id, self._decode(raw)) for job_id, raw in zip(job_ids, values) if raw is not None]
+
+    def keys(self):
+        return [job_id for job_id, _ in self.items()]
+
+    def recent(self, count: int):
+        """Return the count most recently written (job_id, job) pairs, newest first."""
+        if count <= 0:
+            return []
+        self.expire()
+        job_ids = [job_id.decode() for job_id in self._redis.zrevrange(self._index, 0, count - 1)]
+        if not job_ids:
+            return []
+        values = self._redis.mget([self._key(job_id) for job_id in job_ids])
+        return [(job_id, self._decode(raw)) for job_id, raw in zip(job_ids, values) if raw is not None]
+
+    def update(self, job_id, fields):
+        job = self.get(job_id)
+        if job is not None:
+            job.update(fields)
+            self[job_id] = job
+        return job
+
+    def expire(self):
+        cutoff = time.time_ns() - self._ttl * 1_000_000_000
+        self._redis.zremrangebyscore(self._index, '-inf', cutoff)
+
+REDIS_URL = os.environ.get('REDIS_URL')
+redis_client = None
+if REDIS_URL:
+    try:
+        import redis
+        redis_client = redis.Redis(
+            connection_pool=redis.ConnectionPool.from_url(REDIS_URL)
+        )
+    except ImportError:
+        print("Warning: REDIS_URL is set but redis is not installed, keeping jobs in memory")
+
+if redis_client is not None:
+    jobs = RedisJobStore(redis_client, 'job', ttl=86400)
+else:
+    jobs = ShardedJobStore(maxsize=4096, ttl=86400)
+job_futures: Dict[str, Future] = {}
+pending_predictions: ShardedJobStore = ShardedJobStore(maxsize=1024, ttl=3600)
+job_subscribers: Dict[str, List[SimpleQueue]] = {}
+
+def job_source(job: Dict) -> str:
+    """Name of the store a job would have lived in before active and finished jobs shared one."""
+    return 'job_results' if job.get('status') in FINISHED_STATUSES else 'active_jobs'
+
+def get_job_snapshot(job_id: str) -> Optional[Dict]:
+    """Return a copy of the job's current state tagged with its source, or None."""
+    with job_lock(job_id):
+        job = jobs.get(job_id)
+        if job is not None:
+            return {**job, 'source': job_source(job)}
+    return None
+
+def subscribe_job(job_id: str) -> SimpleQueue:
+    updates = SimpleQueue()
+    with job_lock(job_id):
+        job_subscribers.setdefault(job_id, []).append(updates)
+    return updates
+
+def unsubscribe_job(job_id: str, updates: SimpleQueue):
+    with job_lock(job_id):
+        subscribers = job_subscribers.get(job_id, [])
+        if updates in subscribers:
+            subscribers.remove(updates)
+        if not subscribers:
+            job_subscribers.pop(job_id, None)
+
+def publish_job_update(job_id: str):
+    with job_lock(job_id):
+        subscribers = list(job_subscribers.get(job_id, ()))
+    if subscribers:
+        snapshot = get_job_snapshot(job_id)
+        for updates in subscribers:
+            updates.put(snapshot)
 
-ALLOWED_EXTENSIONS = {'txt', 'docx', 'pdf'}
+def set_job_progress(job_id: str, status: str, progress: int):
+    with job_lock(job_id):
+        jobs.update(job_id, {'status': status, 'progress': progress})
+    publish_job_update(job_id)
+
+@lru_cache(maxsize=1)
+def _iso_from_seconds(seconds: int) -> str:
+    return datetime.fromtimestamp(seconds).isoformat()
+
+def iso_timestamp(ns: Optional[int] = None) -> str:
+    """ISO-format a time.time_ns() value like datetime.isoformat(), reusing the formatted second."""
+    if ns is None:
+        ns = time.time_ns()
+    seconds, remainder = divmod(ns, 1_000_000_000)
+    microseconds = remainder // 1000
+    if microseconds:
+        return f"{_iso_from_seconds(seconds)}.{microseconds:06d}"
+    return _iso_from_seconds(seconds)
+
+# A versioned model from CONTEXT_CACHE_MODELS also enables uploaded-document context caching
+LLM_MODEL = os.environ.get('LLM_MODEL', 'gemini-2.0-flash-exp')
+
+slide_prediction_cache = LLMCache(maxsize=512, ttl=3600)
+# Exact keys: tone, topic and document text are case- and layout-sensitive prompt inputs
+presentation_content_cache = LLMCache(maxsize=256, ttl=86400, directory=CACHE_DIR, normalize=False)
+
+def content_cache_source(config: Dict) -> str:
+    """Serialize the config fields that shape the generated slide text."""
+    fields = {
+        'topic': config.get('topic'),
+        'num_slides': config.get('num_slides'),
+        'tone': config.get('tone'),
+        'audience': config.get('audience'),
+        'theme': config.get('theme'),
+        'doc_content': config.get('doc_content')
+    }
+    # doc_content can run to megabytes, so prefer orjson here
+    if orjson is not None:
+        return orjson.dumps(fields, option=orjson.OPT_SORT_KEYS).decode('utf-8')
+    return json.dumps(fields, sort_keys=True)
+
+@lru_cache(maxsize=1)
+def get_llm():
+    """Return the process-wide Gemini client, creating it on first use."""
+    return ChatGoogleGenerativeAI(
+        model=LLM_MODEL,
+        temperature=0.0
+    )
+
+@lru_cache(maxsize=64)
+def get_cached_context_llm(cached_content: str):
+    """Return a Gemini client bound to a CachedContent, reused across jobs on the same document."""
+    return ChatGoogleGenerativeAI(
+        model=LLM_MODEL,
+        temperature=0.0,
+        cached_content=cached_content
+    )
+
+RENDER_PROCESSES = int(os.environ.get('RENDER_PROCESSES', os.cpu_count() or 1))
+
+@lru_cache(maxsize=1)
+def get_render_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the process pool that builds slide decks, or None to build them in the calling thread."""
+    if RENDER_PROCESSES <= 0:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=RENDER_PROCESSES,
+        mp_context=multiprocessing.get_context('spawn')
+    )
+
+CONTEXT_CACHE_MIN_TOKENS = 2048
+CONTEXT_CACHE_TTL = 3600
+# CachedContent only accepts explicitly versioned models; -exp and alias names are rejected
+CONTEXT_CACHE_MODELS = frozenset({
+    'gemini-1.5-flash-001', 'gemini-1.5-flash-002', 'gemini-1.5-pro-001', 'gemini-1.5-pro-002'
+})
+CONTEXT_CACHE_ENABLED = caching is not None and LLM_MODEL in CONTEXT_CACHE_MODELS
+document_caches = ShardedJobStore(1024, CONTEXT_CACHE_TTL)
+
+def create_document_cache(filepath: str, doc_content: str) -> Optional[str]:
+    """Upload doc_content once as Gemini cached context and remember its name for filepath."""
+    if not CONTEXT_CACHE_ENABLED or len(doc_content) < CONTEXT_CACHE_MIN_TOKENS * 4:
+        return None
+    
+    try:
+        if get_llm().get_num_tokens(doc_content) < CONTEXT_CACHE_MIN_TOKENS:
+            return None
+        
+        cache = caching.CachedContent.create(
+            model=f"models/{LLM_MODEL}",
+            contents=[doc_content],
+            ttl=timedelta(seconds=CONTEXT_CACHE_TTL)
+        )
+    except Exception as e:
+        logger.warning(f"Context caching unavailable for {filepath}: {e}")
+        return None
+    
+    document_caches[filepath] = cache.name
+    return cache.name
+
+ALLOWED_EXTENSIONS = frozenset({'txt', 'docx', 'pdf'})
 
 def allowed_file(filename):
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    _, dot, extension = filename.rpartition('.')
+    return bool(dot) and extension.lower() in ALLOWED_EXTENSIONS
 
 def cleanup_old_files():
+    jobs.expire()
+    
     try:
-        current_time = datetime.now()
-        cutoff_time = current_time - timedelta(hours=24)
+        cutoff_time = time.time() - 24 * 3600
         
-        if os.environ.get('DYNO'):
-            upload_folder = '/tmp'
-            output_folder = '/tmp'
-        else:
-            upload_folder = 'uploads'
-            output_folder = 'outputs'
-        
-        if os.path.exists(upload_folder):
-            for filename in os.listdir(upload_folder):
-                filepath = os.path.join(upload_folder, filename)
-                if os.path.isfile(filepath):
-                    file_time = datetime.fromtimestamp(os.path.getmtime(filepath))
-                    if file_time < cutoff_time:
-                        os.remove(filepath)
-                        logger.info(f"Cleaned up old upload: {filename}")
-        
-        if os.path.exists(output_folder):
-            for filename in os.listdir(output_folder):
-                filepath = os.path.join(output_folder, filename)
-                if os.path.isfile(filepath):
-                    file_time = datetime.fromtimestamp(os.path.getmtime(filepath))
-                    if file_time < cutoff_time:
-                        os.remove(filepath)
-                        logger.info(f"Cleaned up old output: {filename}")
+        # On Heroku uploads and outputs share /tmp; keying by path scans it once
+        folders = {UPLOADS_DIR: 'upload', OUTPUTS_DIR: 'output', CACHE_DIR: 'cached content'}
+        for folder, label in folders.items():
+            remove_files_older_than(folder, cutoff_time, label)
                         
     except Exception as e:
         logger.error(f"Error during cleanup: {e}")
 
+def remove_files_older_than(folder: str, cutoff_time: float, label: str):
+    """Delete regular files in folder last modified before cutoff_time, using one scandir pass."""
+    try:
+        with os.scandir(folder) as entries:
+            victims = [
+                entry for entry in entries
+                if entry.is_file(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_mtime < cutoff_time
+            ]
+    except FileNotFoundError:
+        return
+    
+    for entry in victims:
+        try:
+            os.unlink(entry.path)
+            logger.info(f"Cleaned up old {label}: {entry.name}")
+        except OSError as e:
+            logger.warning(f"Could not remove {entry.path}: {e}")
+
+def extract_pdf_pages_pdfium(file_path: str) -> List[str]:
+    """Extract per-page text with PDFium, which does the text layout in C."""
+    if pdfium is None:
+        raise ImportError("pypdfium2 is not installed")
+    
+    pages = []
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        for page in pdf:
+            textpage = page.get_textpage()
+            try:
+                pages.append(textpage.get_text_range().replace('\r\n', '\n'))
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+    return pages
+
+def extract_pdf_pages_pdfplumber(file_path: str) -> List[str]:
+    with pdfplumber.open(file_path) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages]
+
 def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text from PDF using pdfplumber for better accuracy."""
+    """Extract text from PDF with pypdfium2, falling back to pdfplumber."""
     try:
-        import pdfplumber
-        text = ""
-        with pdfplumber.open(file_path) as pdf:
-            total_pages = len(pdf.pages)
-            for page_num, page in enumerate(pdf.pages, 1):
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        
-        final_text = text.strip()
+        try:
+            pages = extract_pdf_pages_pdfium(file_path)
+        except ImportError:
+            if pdfplumber is None:
+                raise
+            pages = extract_pdf_pages_pdfplumber(file_path)
+        except Exception as pdfium_error:
+            # pdfium rejects some files (PdfiumError and friends) that pdfplumber can still read
+            if pdfplumber is None:
+                raise
+            logger.warning(f"pypdfium2 could not read {file_path} ({pdfium_error}); retrying with pdfplumber")
+            pages = extract_pdf_pages_pdfplumber(file_path)
+        
+        final_text = "\n".join(page_text for page_text in pages if page_text).strip()
         if not final_text:
             logger.warning(f"No extractable text found in PDF: {file_path}. This may be an image-based PDF.")
             raise Exception("This PDF appears to contain only images without extractable text. Please try a PDF with text content or convert it to a text-based format.")
         
         return final_text
     except ImportError:
-        logger.error("pdfplumber not installed for PDF support")
-        raise ImportError("pdfplumber not installed. Please install with: pip install pdfplumber")
+        logger.error("Neither pypdfium2 nor pdfplumber is installed for PDF support")
+        raise ImportError("No PDF library installed. Please install with: pip install pypdfium2")
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {e}")
         raise Exception(f"Error reading PDF file: {str(e)}")
 
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+WORD_TEXT_TAGS = {f"{WORD_NS}t": None, f"{WORD_NS}tab": '\t', f"{WORD_NS}br": '\n', f"{WORD_NS}cr": '\n'}
+
+def extract_text_from_docx_fast(file_path: str) -> str:
+    """Stream paragraph text out of word/document.xml without building python-docx objects."""
+    if etree is None:
+        raise ImportError("lxml is not installed")
+    
+    text_parts = []
+    with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as document:
+        for _, paragraph in etree.iterparse(document, events=("end",), tag=f"{WORD_NS}p"):
+            pieces = []
+            for node in paragraph.iter(*WORD_TEXT_TAGS):
+                replacement = WORD_TEXT_TAGS[node.tag]
+                if replacement is None:
+                    pieces.append(node.text or '')
+                else:
+                    pieces.append(replacement)
+            text = ''.join(pieces).strip()
+            if text:
+                text_parts.append(text)
+            
+            # Drop finished paragraphs so memory stays flat on long documents
+            paragraph.clear()
+            parent = paragraph.getparent()
+            while parent is not None and paragraph.getprevious() is not None:
+                del parent[0]
+    
+    return "\n".join(text_parts)
+
 def extract_text_from_docx(file_path: str) -> str:
-    """Extract text from DOCX using python-docx."""
+    """Extract text from DOCX, streaming the XML and falling back to python-docx."""
     try:
-        from docx import Document
-        doc = Document(file_path)
+        return extract_text_from_docx_fast(file_path)
+    except Exception as e:
+        logger.warning(f"Fast DOCX extraction failed for {file_path}, using python-docx: {e}")
+    
+    try:
+        if DocxDocument is None:
+            raise ImportError("python-docx is not installed")
+        doc = DocxDocument(file_path)
         text_parts = []
         
         # Extract text from paragraphs
@@ -893,101 +1562,92 @@ def extract_text_from_txt(file_path: str) -> str:
         logger.error(f"Error reading text file: {e}")
         raise Exception(f"Error reading text file: {str(e)}")
 
+EXTENSION_MIME_TYPES = {
+    '.pdf': 'application/pdf',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.doc': 'application/msword',
+    '.txt': 'text/plain'
+}
+
 def detect_file_type(file_path: str) -> str:
     """Detect file type using multiple methods."""
+    # First try python-magic if available
     try:
-        # First try python-magic if available
-        try:
-            import magic
-            mime = magic.Magic(mime=True)
-            return mime.from_file(file_path)
-        except ImportError:
-            pass
-        except Exception as e:
-            logger.warning(f"python-magic detection failed: {e}")
-    
-        # Fallback to file extension
-        ext = os.path.splitext(file_path)[1].lower()
-        mime_map = {
-            '.pdf': 'application/pdf',
-            '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            '.doc': 'application/msword',
-            '.txt': 'text/plain'
-        }
-        
-        return mime_map.get(ext, 'application/octet-stream')
-        
+        if magic is not None:
+            return magic.Magic(mime=True).from_file(file_path)
     except Exception as e:
-        logger.error(f"Error detecting file type: {e}")
-        # Final fallback to extension
-        ext = os.path.splitext(file_path)[1].lower()
-        if ext == '.pdf':
-            return 'application/pdf'
-        elif ext in ['.docx', '.doc']:
-            return 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-        elif ext == '.txt':
-            return 'text/plain'
-        else:
-            return 'application/octet-stream'
+        logger.warning(f"python-magic detection failed: {e}")
+    
+    # Fallback to file extension
+    ext = os.path.splitext(file_path)[1].lower()
+    return EXTENSION_MIME_TYPES.get(ext, 'application/octet-stream')
+
+DOCUMENT_READERS = {
+    'application/pdf': extract_text_from_pdf,
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': extract_text_from_docx,
+    'application/msword': extract_text_from_docx,
+    'text/plain': extract_text_from_txt
+}
 
 def read_document_content(filepath: str) -> str:
     """Enhanced document text extraction with automatic file type detection."""
     try:
-        if not os.path.exists(filepath):
-            raise FileNotFoundError(f"File not found: {filepath}")
-        
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        logger.error(f"Error reading document {filepath}: file not found")
+        raise Exception(f"Error reading document: File not found: {filepath}")
+    
+    # Keyed on mtime and size so a regeneration from the same upload skips re-parsing
+    return read_document_content_cached(filepath, stat.st_mtime_ns, stat.st_size)
+
+@lru_cache(maxsize=32)
+def read_document_content_cached(filepath: str, mtime_ns: int, size: int) -> str:
+    try:
         # Detect file type
         mime_type = detect_file_type(filepath)
         logger.info(f"Detected file type: {mime_type} for file: {filepath}")
         
-        # Extract text based on file type
-        if mime_type == "application/pdf":
-            return extract_text_from_pdf(filepath)
-        elif mime_type in [
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            "application/msword"
-        ]:
-            return extract_text_from_docx(filepath)
-        elif mime_type == "text/plain":
-            return extract_text_from_txt(filepath)
-        else:
-            # Try to determine by file extension as fallback
+        # Extract text based on file type, falling back to the extension
+        reader = DOCUMENT_READERS.get(mime_type)
+        if reader is None:
             ext = os.path.splitext(filepath)[1].lower()
-            if ext == '.pdf':
-                return extract_text_from_pdf(filepath)
-            elif ext in ['.docx', '.doc']:
-                return extract_text_from_docx(filepath)
-            elif ext == '.txt':
-                return extract_text_from_txt(filepath)
-            else:
-                raise ValueError(f"Unsupported file type: {mime_type}. Supported types: PDF, DOCX, TXT")
-            
+            reader = DOCUMENT_READERS.get(EXTENSION_MIME_TYPES.get(ext))
+        if reader is None:
+            raise ValueError(f"Unsupported file type: {mime_type}. Supported types: PDF, DOCX, TXT")
+        
+        return reader(filepath)
+        
     except Exception as e:
         logger.error(f"Error reading document {filepath}: {e}")
         raise Exception(f"Error reading document: {str(e)}")
 
-def generate_presentation_content(config: Dict) -> str:
-    try:
-        print(f"DEBUG: Config keys: {list(config.keys())}")
-        print(f"DEBUG: Has doc_content: {'doc_content' in config}")
-        if config.get('doc_content'):
-            print(f"DEBUG: Document content length: {len(config['doc_content'])}")
-        else:
-            print(f"DEBUG: Topic: '{config.get('topic', 'NONE')}'")
+def build_content_chain(config: Dict):
+    """Return the (chain, inputs) pair that asks the LLM for slide text for config."""
+    print(f"DEBUG: Config keys: {list(config.keys())}")
+    print(f"DEBUG: Has doc_content: {'doc_content' in config}")
+    if config.get('doc_content'):
+        print(f"DEBUG: Document content length: {len(config['doc_content'])}")
+    else:
+        print(f"DEBUG: Topic: '{config.get('topic', 'NONE')}'")
+    
+    llm = get_llm()
+    cached_content = config.get('cached_content')
+    if cached_content:
+        llm = get_cached_context_llm(cached_content)
+    
+    if config.get('doc_content'):
+        logger.info(f"Generating content from document using few-shot examples")
         
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
-            temperature=0.0
-        )
+        few_shot_prompt = create_enhanced_few_shot_prompt()
         
-        if config.get('doc_content'):
-            logger.info(f"Generating content from document using few-shot examples")
-            
-            few_shot_prompt = create_enhanced_few_shot_prompt()
-            
-            from langchain.prompts import PromptTemplate
-            
-            doc_template = f"""Here are examples of how to create presentations:
+        if cached_content:
+            doc_section = "(the document is provided in the cached context)"
+            input_variables = ["num_slides", "tone", "audience", "theme"]
+        else:
+            doc_section = "{doc_content}"
+            input_variables = ["doc_content", "num_slides", "tone", "audience", "theme"]
+        
+        doc_template = f"""Here are examples of how to create presentations:
 
 {few_shot_prompt.prefix}
 
@@ -997,7 +1657,7 @@ Now, create a {{num_slides}}-slide PowerPoint presentation by summarizing the fo
 Follow the exact same format as shown in the examples above.
 
 Document Content:
-{{doc_content}}
+{doc_section}
 
 Topic: Document Summary
 Number of slides: {{num_slides}}
@@ -1007,91 +1667,158 @@ Theme: {{theme}}
 
 Create a {{num_slides}}-slide presentation following the exact format shown. Include image_query and flowchart_description where appropriate.
 """
-            
-            doc_prompt = PromptTemplate(
-                input_variables=["doc_content", "num_slides", "tone", "audience", "theme"],
-                template=doc_template
-            )
-            
-            chain = doc_prompt | llm
-            output = chain.invoke({
-                "doc_content": config["doc_content"],
-                "num_slides": config["num_slides"],
-                "tone": config["tone"],
-                "audience": config["audience"],
-                "theme": config["theme"]
-            })
-            
-        else:
-            logger.info(f"Generating content for topic: {config.get('topic')}")
-            
-            few_shot_prompt = create_enhanced_few_shot_prompt()
-            chain = few_shot_prompt | llm
-            
-            prompt_input = {
-                "topic": config["topic"],
-                "num_slides": config["num_slides"],
-                "tone": config["tone"],
-                "audience": config["audience"],
-                "theme": config["theme"]
-            }
-            logger.info(f"Using few-shot prompt with input: {prompt_input}")
-            
-            output = chain.invoke(prompt_input)
         
-        logger.info(f"LLM output type: {type(output)}")
-        logger.info(f"LLM output: {str(output)[:500]}...")
+        doc_prompt = PromptTemplate(
+            input_variables=input_variables,
+            template=doc_template
+        )
+        
+        chain = doc_prompt | llm
+        prompt_input = {
+            "num_slides": config["num_slides"],
+            "tone": config["tone"],
+            "audience": config["audience"],
+            "theme": config["theme"]
+        }
+        if not cached_content:
+            prompt_input["doc_content"] = config["doc_content"]
         
-        extracted_text = extract_text_from_llm_output(output)
-        logger.info(f"Extracted text length: {len(extracted_text) if extracted_text else 0}")
+    else:
+        logger.info(f"Generating content for topic: {config.get('topic')}")
         
-        return extracted_text
+        few_shot_prompt = create_enhanced_few_shot_prompt()
+        chain = few_shot_prompt | llm
+        
+        prompt_input = {
+            "topic": config["topic"],
+            "num_slides": config["num_slides"],
+            "tone": config["tone"],
+            "audience": config["audience"],
+            "theme": config["theme"]
+        }
+        logger.info(f"Using few-shot prompt with input: {prompt_input}")
+    
+    return chain, prompt_input
+
+def extract_presentation_content(output) -> str:
+    logger.info(f"LLM output type: {type(output)}")
+    logger.info(f"LLM output: {str(output)[:500]}...")
+    
+    extracted_text = extract_text_from_llm_output(output)
+    logger.info(f"Extracted text length: {len(extracted_text) if extracted_text else 0}")
+    
+    return extracted_text
+
+def generate_presentation_content(config: Dict) -> str:
+    cache_source = content_cache_source(config)
+    cached = presentation_content_cache.get(LLM_MODEL, cache_source)
+    if cached is not None:
+        logger.info("Reusing cached presentation content")
+        return cached
+    
+    try:
+        chain, prompt_input = build_content_chain(config)
+        content = extract_presentation_content(chain.invoke(prompt_input))
+        if content:
+            presentation_content_cache.set(LLM_MODEL, cache_source, content)
+        return content
         
     except Exception as e:
-        logger.error(f"Error generating content: {e}")
-        logger.error(f"Error traceback: {traceback.format_exc()}")
+        logger.error(f"Error generating content: {e}", exc_info=True)
         raise
 
-def process_presentation_job(job_id: str, config: Dict):
+def lookup_presentation_content(config: Dict) -> Tuple[str, Optional[str]]:
+    """Return the config's content cache key source and any cached content for it."""
+    cache_source = content_cache_source(config)
+    return cache_source, presentation_content_cache.get(LLM_MODEL, cache_source)
+
+async def generate_presentation_content_async(config: Dict, executor=None) -> str:
+    """Await the LLM on the event loop; serialization and cache disk I/O run on executor."""
+    loop = asyncio.get_running_loop()
+    cache_source, cached = await loop.run_in_executor(executor, lookup_presentation_content, config)
+    if cached is not None:
+        logger.info("Reusing cached presentation content")
+        return cached
+    
     try:
-        print(f"Starting job processing for job_id: {job_id}")
+        chain, prompt_input = build_content_chain(config)
+        content = extract_presentation_content(await chain.ainvoke(prompt_input))
+        if content:
+            await loop.run_in_executor(
+                executor, presentation_content_cache.set, LLM_MODEL, cache_source, content
+            )
+        return content
         
-        if job_id not in active_jobs:
-            print(f"WARNING: Job {job_id} not found in active_jobs at start of processing")
-            active_jobs[job_id] = {
-                'status': 'started',
-                'progress': 0,
-                'created_at': datetime.now().isoformat(),
-                'config': config
+    except Exception as e:
+        logger.error(f"Error generating content: {e}", exc_info=True)
+        raise
+
+def mark_job_failed(job_id: str, error: Exception, config: Optional[Dict] = None):
+    logger.error(f"Job {job_id} failed: {error}", exc_info=error)
+    
+    failure = {'status': 'failed', 'error': str(error), 'completed_at': iso_timestamp()}
+    with job_lock(job_id):
+        if jobs.update(job_id, failure) is None:
+            created_at_ns = time.time_ns()
+            jobs[job_id] = {
+                **failure,
+                'created_at_ns': created_at_ns,
+                'created_at': iso_timestamp(created_at_ns),
+                'config': config or {}
             }
-        
-        active_jobs[job_id]['status'] = 'generating_content'
-        active_jobs[job_id]['progress'] = 20
-        print(f"Job {job_id}: Updated status to generating_content")
+    publish_job_update(job_id)
+
+def fail_orphaned_jobs():
+    """Mark unfinished jobs failed when the job store outlived the process that ran them."""
+    if not isinstance(jobs, RedisJobStore):
+        return
+    # Futures are per-process, so with one worker nothing left unfinished can still be running
+    for job_id, job in jobs.items():
+        if job.get('status') not in FINISHED_STATUSES:
+            mark_job_failed(job_id, RuntimeError("Server restarted before the job finished"))
+
+async def process_presentation_job_async(job_id: str, config: Dict, executor):
+    """Await the LLM on the event loop; job-store writes and rendering run on executor."""
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(executor, set_job_progress, job_id, 'generating_content', 20)
         
         logger.info(f"Job {job_id}: Generating AI content")
-        content = generate_presentation_content(config)
-        
-        active_jobs[job_id]['status'] = 'parsing_content'
-        active_jobs[job_id]['progress'] = 40
-        
-        logger.info(f"Job {job_id}: Parsing slide content")
-        slides_data = parse_slides_enhanced(content)
+        content = await generate_presentation_content_async(config, executor)
+    except Exception as e:
+        await loop.run_in_executor(executor, mark_job_failed, job_id, e, config)
+        return
+    
+    await loop.run_in_executor(executor, process_presentation_job, job_id, config, content)
+
+def process_presentation_job(job_id: str, config: Dict, content: Optional[str] = None):
+    try:
+        print(f"Starting job processing for job_id: {job_id}")
         
-        if not slides_data:
-            raise Exception("Could not parse slide content")
+        created_at_ns = time.time_ns()
+        with job_lock(job_id):
+            if job_id not in jobs:
+                print(f"WARNING: Job {job_id} not found in jobs at start of processing")
+                jobs[job_id] = {
+                    'status': 'started',
+                    'progress': 0,
+                    'created_at_ns': created_at_ns,
+                    'created_at': iso_timestamp(created_at_ns),
+                    'config': config
+                }
+        
+        if content is None:
+            set_job_progress(job_id, 'generating_content', 20)
+            print(f"Job {job_id}: Updated status to generating_content")
+            
+            logger.info(f"Job {job_id}: Generating AI content")
+            content = generate_presentation_content(config)
         
-        active_jobs[job_id]['status'] = 'creating_presentation'
-        active_jobs[job_id]['progress'] = 60
+        # Slides are parsed as they are rendered, inside create_enhanced_ppt_from_text
+        set_job_progress(job_id, 'creating_presentation', 60)
         
         logger.info(f"Job {job_id}: Creating presentation")
         
-        if os.environ.get('DYNO'):
-            output_folder = '/tmp'
-        else:
-            output_folder = 'outputs'
-            os.makedirs(output_folder, exist_ok=True)
-        
         file_format = config.get('file_format', 'pptx')
         
         user_filename = config['filename']
@@ -1104,20 +1831,17 @@ def process_presentation_job(job_id: str, config: Dict):
             final_extension = '.pptx'
             file_format = 'pptx'
         
-        if os.environ.get('DYNO'):
-            output_filename = f"/tmp/{job_id}_{base_filename}"
-        else:
-            output_filename = os.path.join(output_folder, f"{job_id}_{base_filename}")
+        output_filename = os.path.join(OUTPUTS_DIR, f"{job_id}_{base_filename}")
         
         processed_flowcharts = []
         flowcharts = config.get('flowcharts', [])
-        logger.info(f"Processing {len(flowcharts)} flowcharts")
+        logger.info("Processing %d flowcharts", len(flowcharts))
         
         for i, flowchart in enumerate(flowcharts):
-            logger.info(f"Processing flowchart {i+1}: {flowchart}")
+            logger.info("Processing flowchart %d: %r", i + 1, flowchart)
             if isinstance(flowchart, dict) and 'description' in flowchart:
                 original_desc = flowchart['description']
-                logger.info(f"Original flowchart description: {original_desc[:100]}...")
+                logger.info("Original flowchart description: %.100s...", original_desc)
                 
                 converted_desc = convert_simple_flowchart_to_mermaid(original_desc)
                 if converted_desc:
@@ -1125,16 +1849,16 @@ def process_presentation_job(job_id: str, config: Dict):
                         'title': flowchart.get('title', 'Flowchart'),
                         'description': converted_desc
                     })
-                    logger.info(f"Successfully converted simple flowchart format to Mermaid")
-                    logger.info(f"Converted description: {converted_desc[:100]}...")
+                    logger.info("Successfully converted simple flowchart format to Mermaid")
+                    logger.info("Converted description: %.100s...", converted_desc)
                 else:
                     processed_flowcharts.append(flowchart)
-                    logger.warning(f"Flowchart conversion failed, using original format")
+                    logger.warning("Flowchart conversion failed, using original format")
             else:
                 processed_flowcharts.append(flowchart)
-                logger.info(f"Using flowchart as-is (not dict or missing description)")
+                logger.info("Using flowchart as-is (not dict or missing description)")
         
-        logger.info(f"Final processed flowcharts: {len(processed_flowcharts)}")
+        logger.info("Final processed flowcharts: %d", len(processed_flowcharts))
         
         flowcharts_tuples = []
         for flowchart in processed_flowcharts:
@@ -1142,25 +1866,29 @@ def process_presentation_job(job_id: str, config: Dict):
                 title = flowchart.get('title', 'Flowchart')
                 description = flowchart.get('description', '')
                 flowcharts_tuples.append((title, description))
-                logger.info(f"Converted flowchart: {title}")
+                logger.info("Converted flowchart: %s", title)
             else:
-                logger.warning(f"Unexpected flowchart format: {type(flowchart)}")
+                logger.warning("Unexpected flowchart format: %s", type(flowchart))
         
-        logger.info(f"Final flowcharts for PPT creation: {len(flowcharts_tuples)} tuples")
+        logger.info("Final flowcharts for PPT creation: %d tuples", len(flowcharts_tuples))
         
-        create_enhanced_ppt(
-            slides_data=slides_data,
-            filename=output_filename,
-            output_format=file_format,
-            theme=config['theme'],
-            text_size=config['text_size'],
-            flowcharts=flowcharts_tuples
-        )
+        render_args = {
+            'slide_text': content,
+            'filename': output_filename,
+            'output_format': file_format,
+            'theme': config['theme'],
+            'text_size': config['text_size'],
+            'flowcharts': flowcharts_tuples
+        }
+        render_pool = get_render_pool()
+        if render_pool is not None:
+            slides_count = render_pool.submit(create_enhanced_ppt_from_text, **render_args).result()
+        else:
+            slides_count = create_enhanced_ppt_from_text(**render_args)
         
         if config.get('file_format') == 'pdf':
             logger.info(f"Job {job_id}: Converting to PDF")
-            active_jobs[job_id]['status'] = 'converting_to_pdf'
-            active_jobs[job_id]['progress'] = 80
+            set_job_progress(job_id, 'converting_to_pdf', 80)
             
             pptx_file = f"{output_filename}.pptx"
             pdf_file = f"{output_filename}.pdf"
@@ -1209,9 +1937,7 @@ def process_presentation_job(job_id: str, config: Dict):
                 logger.info(f"PDF conversion successful: {final_filepath}")
                 
             except Exception as pdf_error:
-                logger.error(f"PDF conversion failed: {pdf_error}")
-                import traceback
-                logger.error(f"PDF conversion traceback: {traceback.format_exc()}")
+                logger.error(f"PDF conversion failed: {pdf_error}", exc_info=True)
                 logger.warning("Falling back to PPTX format")
                 
                 try:
@@ -1224,92 +1950,164 @@ def process_presentation_job(job_id: str, config: Dict):
                 final_filepath = pptx_file
         else:
             final_output_filename = f"{job_id}_{base_filename}.pptx"
-            if os.environ.get('DYNO'):
-                final_filepath = f"/tmp/{job_id}_{base_filename}.pptx"
-            else:
-                final_filepath = f"{output_filename}.pptx"
+            final_filepath = f"{output_filename}.pptx"
         
-        active_jobs[job_id]['status'] = 'completed'
-        active_jobs[job_id]['progress'] = 100
-        
-        job_results[job_id] = {
+        completion = {
             'status': 'completed',
+            'progress': 100,
             'filename': final_output_filename,
             'filepath': final_filepath,
-            'slides_count': len(slides_data),
-            'created_at': datetime.now().isoformat(),
-            'config': config
+            'slides_count': slides_count,
+            'completed_at': iso_timestamp()
         }
+        with job_lock(job_id):
+            if jobs.update(job_id, completion) is None:
+                logger.error(f"Job {job_id}: entry missing from job store at completion; recreating it")
+                created_at_ns = time.time_ns()
+                jobs[job_id] = {
+                    **completion,
+                    'created_at_ns': created_at_ns,
+                    'created_at': iso_timestamp(created_at_ns),
+                    'config': config
+                }
+        publish_job_update(job_id)
         
         logger.info(f"Job {job_id}: Completed successfully")
-        print(f"Job {job_id}: Moved from active_jobs to job_results")
-        print(f"Active jobs remaining: {list(active_jobs.keys())}")
-        print(f"Completed jobs: {list(job_results.keys())}")
-        
-        if job_id in active_jobs:
-            del active_jobs[job_id]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Known jobs: %s", jobs.keys())
         
     except Exception as e:
-        logger.error(f"Job {job_id} failed: {e}")
-        print(f"Job {job_id} FAILED: {e}")
-        
-        if job_id in active_jobs:
-            active_jobs[job_id]['status'] = 'failed'
-            active_jobs[job_id]['error'] = str(e)
-        
-        job_results[job_id] = {
-            'status': 'failed',
-            'error': str(e),
-            'created_at': datetime.now().isoformat()
-        }
+        mark_job_failed(job_id, e, config)
 
 class PPTGeneratorAPI:
     
     def __init__(self, base_url: str = "http://localhost:5000"):
+        if requests is None:
+            raise ImportError("requests is required for PPTGeneratorAPI. Install with: pip install requests")
+        
         self.base_url = base_url.rstrip('/')
+        # One pooled session so repeated calls (e.g. status polling) reuse connections
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
     
     def health_check(self):
-        import requests
         try:
-            response = requests.get(f"{self.base_url}/api/health")
+            response = self._session.get(f"{self.base_url}/api/health")
             return response.status_code == 200
         except:
             return False
     
     def get_config(self):
-        import requests
-        response = requests.get(f"{self.base_url}/api/config")
+        response = self._session.get(f"{self.base_url}/api/config")
         return response.json() if response.status_code == 200 else None
     
     def upload_document(self, file_path: str):
-        import requests
         with open(file_path, 'rb') as f:
             files = {'file': f}
-            response = requests.post(f"{self.base_url}/api/upload", files=files)
+            response = self._session.post(f"{self.base_url}/api/upload", files=files)
         return response.json()
     
     def generate_presentation(self, config: Dict):
-        import requests
-        response = requests.post(f"{self.base_url}/api/generate", json=config)
+        response = self._session.post(f"{self.base_url}/api/generate", json=config)
         return response.json()
     
     def get_job_status(self, job_id: str):
-        import requests
-        response = requests.get(f"{self.base_url}/api/status/{job_id}")
+        response = self._session.get(f"{self.base_url}/api/status/{job_id}")
         return response.json()
     
     def download_presentation(self, job_id: str, save_path: str):
-        import requests
-        response = requests.get(f"{self.base_url}/api/download/{job_id}")
-        if response.status_code == 200:
+        with self._session.get(f"{self.base_url}/api/download/{job_id}", stream=True) as response:
+            if response.status_code != 200:
+                return False
             with open(save_path, 'wb') as f:
-                f.write(response.content)
-            return True
-        return False
+                for chunk in response.iter_content(1 << 16):
+                    f.write(chunk)
+        return True
+
+class AsyncPPTGeneratorAPI:
+    """asyncio counterpart of PPTGeneratorAPI on one pooled httpx.AsyncClient.
+
+    Lets one thread poll many jobs at once, e.g.
+    await asyncio.gather(*(api.get_job_status(job_id) for job_id in job_ids)).
+    """
+    
+    def __init__(self, base_url: str = "http://localhost:5000", max_connections: int = 100):
+        if httpx is None:
+            raise ImportError("httpx is required for AsyncPPTGeneratorAPI. Install with: pip install httpx")
+        
+        self.base_url = base_url.rstrip('/')
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(max_connections=max_connections),
+            timeout=httpx.Timeout(30.0)
+        )
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        await self._client.aclose()
+    
+    async def health_check(self):
+        try:
+            response = await self._client.get("/api/health")
+            return response.status_code == 200
+        except Exception:
+            return False
+    
+    async def get_config(self):
+        response = await self._client.get("/api/config")
+        return response.json() if response.status_code == 200 else None
+    
+    async def upload_document(self, file_path: str):
+        with open(file_path, 'rb') as f:
+            response = await self._client.post("/api/upload", files={'file': f})
+        return response.json()
+    
+    async def generate_presentation(self, config: Dict):
+        response = await self._client.post("/api/generate", json=config)
+        return response.json()
+    
+    async def get_job_status(self, job_id: str):
+        response = await self._client.get(f"/api/status/{job_id}")
+        return response.json()
+    
+    async def get_job_statuses(self, job_ids: List[str]) -> Dict[str, Any]:
+        statuses = await asyncio.gather(*(self.get_job_status(job_id) for job_id in job_ids))
+        return dict(zip(job_ids, statuses))
+    
+    async def download_presentation(self, job_id: str, save_path: str):
+        async with self._client.stream("GET", f"/api/download/{job_id}") as response:
+            if response.status_code != 200:
+                return False
+            with open(save_path, 'wb') as f:
+                async for chunk in response.aiter_bytes(1 << 16):
+                    f.write(chunk)
+        return True
+
+FLOWCHART_SPLIT_RE = re.compile(r'[;\n,]')
+FLOWCHART_CLEAN_RE = re.compile(r'[^\w\s-]')
+FLOWCHART_SPACE_RE = re.compile(r'\s+')
+# Longest arrow first so "A --> B" doesn't split as "A -" / "B"
+FLOWCHART_ARROW_RE = re.compile(r'-->|->|→|=>')
+
+@lru_cache(maxsize=4096)
+def clean_flowchart_node(name: str):
+    """Return (mermaid_id, label) for a raw node name; common labels repeat across decks."""
+    label = FLOWCHART_CLEAN_RE.sub('', name).strip()
+    return FLOWCHART_SPACE_RE.sub('_', label), label
+
+# Re-rendered decks hit the cache instead of re-emitting identical flowcharts
+emit_mermaid_flowchart = lru_cache(maxsize=256)(emit_mermaid)
 
 def convert_simple_flowchart_to_mermaid(description: str) -> str:
     try:
-        logger.info(f"Converting flowchart: {description[:50]}...")
+        logger.info("Converting flowchart: %.50s...", description)
         
         if description.strip().lower().startswith(('flowchart', 'graph', 'sequencediagram')):
             logger.info("Input appears to be valid Mermaid syntax, returning as-is")
@@ -1322,27 +2120,22 @@ def convert_simple_flowchart_to_mermaid(description: str) -> str:
         
         connections = []
         
-        parts = re.split(r'[;\n,]', description)
-        logger.info(f"Split into {len(parts)} parts: {parts}")
+        parts = FLOWCHART_SPLIT_RE.split(description)
+        logger.info("Split into %d parts: %s", len(parts), parts)
         
-        nodes = set()
-        edges = []
+        # Ordered dicts dedupe repeated nodes and edges while keeping first-seen order,
+        # so equal flowcharts emit equal text
+        nodes = {}
+        edges = {}
         
         for part in parts:
             part = part.strip()
             if not part:
                 continue
                 
-            if '->' in part:
-                arrow_parts = part.split('->')
-            elif '→' in part:
-                arrow_parts = part.split('→')
-            elif '-->' in part:
-                arrow_parts = part.split('-->')
-            elif '=>' in part:
-                arrow_parts = part.split('=>')
-            else:
-                logger.warning(f"No arrows found in part: {part}")
+            arrow_parts = FLOWCHART_ARROW_RE.split(part)
+            if len(arrow_parts) < 2:
+                logger.warning("No arrows found in part: %s", part)
                 continue
                 
             for i in range(len(arrow_parts) - 1):
@@ -1350,17 +2143,14 @@ def convert_simple_flowchart_to_mermaid(description: str) -> str:
                 to_node = arrow_parts[i + 1].strip()
                 
                 if from_node and to_node:
-                    from_clean = re.sub(r'[^\w\s-]', '', from_node).strip()
-                    to_clean = re.sub(r'[^\w\s-]', '', to_node).strip()
-                    
-                    from_id = re.sub(r'\s+', '_', from_clean)
-                    to_id = re.sub(r'\s+', '_', to_clean)
+                    from_id, from_clean = clean_flowchart_node(from_node)
+                    to_id, to_clean = clean_flowchart_node(to_node)
                     
                     if from_id and to_id:
-                        nodes.add((from_id, from_clean))
-                        nodes.add((to_id, to_clean))
-                        edges.append((from_id, to_id))
-                        logger.debug(f"Added edge: {from_id} -> {to_id}")
+                        nodes[(from_id, from_clean)] = None
+                        nodes[(to_id, to_clean)] = None
+                        edges[(from_id, to_id)] = None
+                        logger.debug("Added edge: %s -> %s", from_id, to_id)
         
         if not edges:
             logger.warning("No valid edges found in flowchart description")
@@ -1368,26 +2158,10 @@ def convert_simple_flowchart_to_mermaid(description: str) -> str:
         
         logger.info(f"Found {len(nodes)} nodes and {len(edges)} edges")
         
-        mermaid_lines = ['flowchart TD']
-        
-        for node_id, node_label in nodes:
-            if node_label.lower() in ['start', 'begin']:
-                mermaid_lines.append(f'    {node_id}([{node_label}])')
-            elif node_label.lower() in ['end', 'finish', 'stop']:
-                mermaid_lines.append(f'    {node_id}([{node_label}])')
-            elif '?' in node_label or 'decision' in node_label.lower():
-                mermaid_lines.append(f'    {node_id}{{{node_label}}}')
-            else:
-                mermaid_lines.append(f'    {node_id}[{node_label}]')
-        
-        for from_id, to_id in edges:
-            mermaid_lines.append(f'    {from_id} --> {to_id}')
-        
-        result = '\n'.join(mermaid_lines)
-        logger.info(f"Successfully converted to Mermaid: {len(mermaid_lines)} lines")
+        result = emit_mermaid_flowchart(tuple(nodes), tuple(edges))
+        logger.info(f"Successfully converted to Mermaid: {1 + len(nodes) + len(edges)} lines")
         return result
         
-    except Exception as e:
-        logger.error(f"Error converting simple flowchart: {e}")
-        logger.error(f"Error traceback: {traceback.format_exc()}")
+    except Exception:
+        logger.exception("Error converting simple flowchart")
         return None
\ No newline at end of file
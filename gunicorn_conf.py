@@ -0,0 +1,30 @@
+"""
+Gunicorn configuration for SmartSlide Generator
+Usage: gunicorn -c gunicorn_conf.py wsgi:application
+"""
+
+import os
+from dotenv import load_dotenv
+
+env_file = '.env.production' if os.path.exists('.env.production') else '.env'
+load_dotenv(env_file)
+
+bind = os.getenv('BIND', f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', 5002)}")
+
+# Upload predictions, context-cache names, job futures and WebSocket
+# subscribers live in process memory (REDIS_URL only shares the jobs
+# table), so every request for a job must reach the worker that started
+# it. Run exactly one worker process and get concurrency from threads.
+workers = 1
+worker_class = 'gthread'
+# Each open /ws/status socket holds one of these threads for the life of its
+# job, so size THREADS for expected concurrent watchers plus normal requests.
+threads = int(os.getenv('THREADS', 2 * (os.cpu_count() or 1) + 1))
+
+timeout = int(os.getenv('TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'INFO').lower()
@@ -14,6 +14,7 @@ from pptx.enum.text import PP_ALIGN
 from pptx.enum.dml import MSO_THEME_COLOR
 from pptx.dml.color import ColorFormat
 import re
+import itertools
 from dotenv import load_dotenv
 import os
 import platform
@@ -543,8 +544,11 @@ def generate_mermaid_flowchart(description, width=800, height=600):
 
 def parse_slides_enhanced(slide_text):
     """Parse slides for title, bullets, image_query, and flowchart_description."""
+    return list(iter_slides_enhanced(slide_text))
+
+def iter_slides_enhanced(slide_text):
+    """Yield parsed slides one at a time so rendering can start before parsing ends."""
     slides = re.split(r'(?=Slide \d+:)', slide_text.strip())
-    slides_data = []
     
     for slide_block in slides:
         if not slide_block.strip():
@@ -607,16 +611,12 @@ def parse_slides_enhanced(slide_text):
             
             i += 1
         
-        slide_data = {
+        yield {
             'title': title,
             'bullets': bullets,
             'image_query': image_query,
             'flowchart_description': flowchart_description
         }
-        
-        slides_data.append(slide_data)
-    
-    return slides_data
 
 def apply_background_to_slide(slide, background_config):
     """Apply background styling to a slide"""
@@ -660,7 +660,11 @@ def apply_theme_to_slide(slide, theme_config, text_size_config):
         print(f"⚠️ Could not apply theme formatting: {e}")
 
 def create_enhanced_ppt(slides_data, filename="presentation", output_format="pptx", theme="corporate", text_size="medium", flowcharts=None):
-    """Create PowerPoint with image and flowchart visual elements"""
+    """Create PowerPoint with image and flowchart visual elements.
+
+    slides_data may be any iterable of slide dicts (e.g. iter_slides_enhanced);
+    returns the number of parsed slides used.
+    """
     prs = Presentation()
     theme_config = THEMES.get(theme, THEMES["corporate"])
     text_size_config = TEXT_SIZES.get(text_size, TEXT_SIZES["medium"])
@@ -672,16 +676,27 @@ def create_enhanced_ppt(slides_data, filename="presentation", output_format="ppt
     title_slide_layout = prs.slide_layouts[0]
     title_slide = prs.slides.add_slide(title_slide_layout)
     
-    if slides_data:
-        title_slide.shapes.title.text = slides_data[0]['title']
-        if slides_data[0]['bullets']:
-            title_slide.placeholders[1].text = slides_data[0]['bullets'][0]
+    # Peek at two slides: the first titles the deck, and a lone slide is also rendered as content
+    slides_iter = iter(slides_data)
+    first_slide = next(slides_iter, None)
+    second_slide = next(slides_iter, None)
+    if second_slide is not None:
+        content_slides = itertools.chain([second_slide], slides_iter)
+    else:
+        content_slides = [first_slide] if first_slide is not None else []
+    
+    if first_slide is not None:
+        title_slide.shapes.title.text = first_slide['title']
+        if first_slide['bullets']:
+            title_slide.placeholders[1].text = first_slide['bullets'][0]
     
     apply_background_to_slide(title_slide, theme_config["background"])
     apply_theme_to_slide(title_slide, theme_config, text_size_config)
     
     # Process content slides
-    for i, slide_data in enumerate(slides_data[1:] if len(slides_data) > 1 else slides_data, 1):
+    content_count = 0
+    for i, slide_data in enumerate(content_slides, 1):
+        content_count = i
         print(f"\n📄 Creating slide {i}: {slide_data['title']}")
         
         # Determine layout based on whether we have visuals
@@ -905,6 +920,17 @@ def create_enhanced_ppt(slides_data, filename="presentation", output_format="ppt
         final_filename = f"{filename}.pptx"
         prs.save(final_filename)
         print(f"📝 Saved as '{final_filename}'")
+    
+    # A lone slide is both the title and the only content slide
+    return content_count + 1 if second_slide is not None else content_count
+
+def create_enhanced_ppt_from_text(slide_text, **kwargs):
+    """Parse slide_text and render it in one pass; raises ValueError if it holds no slides."""
+    slides = iter_slides_enhanced(slide_text)
+    first_slide = next(slides, None)
+    if first_slide is None:
+        raise ValueError("Could not parse slide content")
+    return create_enhanced_ppt(itertools.chain([first_slide], slides), **kwargs)
 
 def get_user_inputs_enhanced(llm=None):
     """Collect all user inputs, using LLM to predict slide count if document is provided."""
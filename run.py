@@ -5,9 +5,10 @@ from app import create_app
 # Load environment variables
 load_dotenv()
 
-app = create_app()
-
 if __name__ == "__main__":
+    # Built only here: spawn children (render pool, PDF fallback) re-import this module as __mp_main__
+    app = create_app()
+    
     # Get configuration from environment variables
     debug = os.getenv('DEBUG', 'False').lower() == 'true'
     host = os.getenv('HOST', '0.0.0.0')
@@ -39,6 +39,13 @@ if ! command -v libreoffice &> /dev/null && ! command -v soffice &> /dev/null; t
 fi
 
 echo
+if $PYTHON_CMD -c "import gunicorn" &> /dev/null; then
+    echo "🔧 Starting Production Server (Gunicorn gthread)"
+    echo "🌐 http://localhost:5002"
+    echo
+    exec $PYTHON_CMD -m gunicorn -c gunicorn_conf.py wsgi:application
+fi
+
 echo "🔧 Starting Production Server (Waitress WSGI)"
 echo "🌐 http://localhost:5002"
 echo